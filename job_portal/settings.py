@@ -50,12 +50,18 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Serves collected static files (hashed, precompressed) when no front-end
+    # server sits in front of the app.
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Per-request SQL query count/time log line and Server-Timing header.
+    'jobs.middleware.QueryCountMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'jobs.middleware.ReplicaStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'job_portal.urls'
@@ -70,6 +76,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'jobs.context_processors.notifications',
             ],
         },
     },
@@ -81,6 +88,8 @@ WSGI_APPLICATION = 'job_portal.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+DB_POOL = os.environ.get('DB_POOL', '').lower() in ('1', 'true', 'yes')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -89,9 +98,91 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # Re-validate reused connections before handing them to a request.
+        'CONN_HEALTH_CHECKS': True,
+        # Persistent connections are incompatible with the pool, so only keep
+        # them alive between requests when pooling is turned off.
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'OPTIONS': {},
     }
 }
 
+# Connection pooling (psycopg3 pool, see requirements.txt).
+# Enable with DB_POOL=1; sizes and timeouts are tunable from the environment.
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'name': 'job_portal',
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+        # Seconds a request waits for a free connection before erroring out.
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+        'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800')),
+    }
+
+# Read replica for the read-heavy HR/search views (see jobs.db.use_replica).
+# Point DB_REPLICA_HOST (and optionally DB_REPLICA_NAME/USER/PASSWORD/PORT) at
+# the replica, or at a second local database when testing (create its tables
+# with `manage.py migrate --database=replica`).
+if os.environ.get('DB_REPLICA_HOST'):
+    replica = dict(DATABASES['default'])
+    replica.update({
+        'NAME': os.environ.get('DB_REPLICA_NAME', replica['NAME']),
+        'USER': os.environ.get('DB_REPLICA_USER', replica['USER']),
+        'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', replica['PASSWORD']),
+        'HOST': os.environ.get('DB_REPLICA_HOST'),
+        'PORT': os.environ.get('DB_REPLICA_PORT', replica['PORT']),
+        'OPTIONS': dict(replica['OPTIONS']),
+        # The test runner reads through 'default' instead of a separate copy.
+        'TEST': {'MIRROR': 'default'},
+    })
+    if DB_POOL:
+        replica['OPTIONS']['pool'] = dict(replica['OPTIONS']['pool'], name='job_portal_replica')
+    DATABASES['replica'] = replica
+
+DATABASE_ROUTERS = ['jobs.db.PrimaryReplicaRouter']
+# Seconds a user keeps reading from the primary after writing something.
+DB_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', '5'))
+
+# Shared cache (rate-limit buckets, HR dashboards). Without REDIS_URL every
+# worker process keeps its own in-memory cache (limits then apply per process).
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds an HR user's dashboard stays cached (new submissions invalidate it).
+HR_DASHBOARD_CACHE_SECONDS = int(os.environ.get('HR_DASHBOARD_CACHE_SECONDS', '10'))
+
+# Length of a bookable interview slot (also the length of calendar invites).
+INTERVIEW_SLOT_MINUTES = int(os.environ.get('INTERVIEW_SLOT_MINUTES', '60'))
+
+# Token-bucket limits for the public endpoints, per client IP: "<N>/<period>"
+# allows bursts of N requests and refills N tokens per s/m/h/d.
+# cv-upload and application-submit only spend a token on an accepted submission.
+THROTTLE_RATES = {
+    'pages': os.environ.get('THROTTLE_PAGES', '120/m'),
+    'job-search': os.environ.get('THROTTLE_JOB_SEARCH', '60/m'),
+    'cv-upload': os.environ.get('THROTTLE_CV_UPLOAD', '5/h'),
+    'application-submit': os.environ.get('THROTTLE_APPLICATION_SUBMIT', '5/h'),
+}
+
+# Number of reverse proxies in front of Django (nginx, a load balancer...).
+# With 0, clients are told apart by REMOTE_ADDR; behind proxies that is the
+# proxy's address, and every visitor would share one throttle bucket. With N,
+# the client IP is the Nth X-Forwarded-For entry from the right. Never set it
+# higher than the real number of proxies: the client controls the rest.
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -129,6 +220,18 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = "/static/"
 
+# collectstatic writes content-hashed copies of every asset plus .gz/.br
+# variants; hashed files are then served with a far-future immutable
+# Cache-Control header.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'jobs.storage.PortalStaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -146,10 +249,33 @@ STATICFILES_DIRS = [
 ]
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.office365.com'  # or mail.corona.eg
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+# SMTP backend that also counts sent/failed emails for /metrics.
+EMAIL_BACKEND = 'jobs.mail.MetricsEmailBackend'
+# Host/port/TLS can be overridden to point at a local SMTP sink for load tests.
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.office365.com')  # or mail.corona.eg
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '587'))
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '1').lower() in ('1', 'true', 'yes')
 EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+# Bearer token the Prometheus scraper sends to read /metrics without logging in
+# (``Authorization: Bearer <token>``). Unset: /metrics is for staff users only.
+# Not an IP allowlist: behind the reverse proxy every request comes from 127.0.0.1.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'jobs': {
+            'handlers': ['console'],
+            'level': os.environ.get('JOBS_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
@@ -0,0 +1,31 @@
+"""
+Warm-up hook run by wsgi.py/asgi.py before the worker accepts traffic.
+
+Loads the URLconf (and with it every view module) and compiles the project
+templates into the cached loader, so the first requests on a fresh worker
+don't pay for it.
+"""
+
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    # Building the reverse map imports the URLconf and all views.
+    get_resolver().reverse_dict
+
+    for template_dir in settings.TEMPLATES[0]['DIRS']:
+        template_dir = Path(template_dir)
+        for path in sorted(template_dir.rglob('*.html')):
+            name = path.relative_to(template_dir).as_posix()
+            try:
+                get_template(name)
+            except Exception:
+                # A broken template should only break its own page.
+                logger.exception("Failed to pre-compile template %s", name)
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_portal.settings')
 
 application = get_wsgi_application()
+
+# Load the URLconf and compile templates before the worker takes traffic.
+# Set DJANGO_WARMUP=0 to skip (e.g. for management commands importing this).
+if os.environ.get('DJANGO_WARMUP', '1') != '0':
+    from job_portal.warmup import warm_up
+
+    warm_up()
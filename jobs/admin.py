@@ -1,7 +1,220 @@
+import uuid
+
 from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
 from .models import *
-# Register your models here.
-admin.site.register(Job)
-admin.site.register(CVSubmission)
-admin.site.register(ApplicationLink)
-admin.site.register(DetailedApplication)
+
+
+class LargeTablePaginator(Paginator):
+    """
+    Paginator for tables too big to COUNT(*) on every changelist page. An
+    unfiltered list on PostgreSQL uses the planner's row estimate; anything
+    else counts at most COUNT_LIMIT rows past the requested page, so the
+    pages after it stay reachable however many rows match. count_prefix
+    tells the pagination template when the count is not exact.
+    """
+    COUNT_LIMIT = 10000
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, page_hint=1):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.page_hint = page_hint
+        self.count_prefix = ''
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if not queryset.query.where and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                               [queryset.model._meta.db_table])
+                estimate = cursor.fetchone()[0]
+            # -1 until the table is first analyzed; small tables are cheap to count.
+            if estimate > self.COUNT_LIMIT:
+                self.count_prefix = 'About '
+                return estimate
+        # One row past the window tells "exactly this many" from "more".
+        window = self.page_hint * self.per_page + self.COUNT_LIMIT
+        count = queryset[:window + 1].count()
+        if count > window:
+            self.count_prefix = 'More than '
+            return window
+        return count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Defaults for the tables that grow without bound."""
+    paginator = LargeTablePaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        page = request.GET.get(PAGE_VAR, '')
+        return self.paginator(queryset, per_page, orphans, allow_empty_first_page,
+                              page_hint=int(page) if page.isdigit() else 1)
+
+
+class CandidateSearchAdmin(LargeTableAdmin):
+    """
+    Searches through the row's Candidate: an email matches the normalized
+    Candidate.email exactly (unique index), anything else is a name prefix
+    (candidate_name_prefix_idx on PostgreSQL). Rows the backfill has not
+    linked yet are not found.
+    """
+    candidate_path = 'candidate__'
+    search_fields = ['candidate__full_name']
+    search_help_text = "An email address, or the start of the candidate's name."
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if '@' in term:
+            return queryset.filter(**{f'{self.candidate_path}email': Candidate.normalize_email(term)}), False
+        # The whole term, not word by word: "Mona Ali" is one name prefix.
+        return queryset.filter(**{f'{self.candidate_path}full_name__istartswith': term}), False
+
+
+@admin.register(Department)
+class DepartmentAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug']
+    search_fields = ['name']
+    prepopulated_fields = {'slug': ['name']}
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['title', 'department', 'location', 'is_active', 'created_by', 'created_at']
+    list_select_related = ['department', 'created_by']
+    list_filter = ['is_active', 'department']
+    ordering = ['-created_at']
+    search_fields = ['title']
+    autocomplete_fields = ['created_by']
+
+
+@admin.register(Candidate)
+class CandidateAdmin(CandidateSearchAdmin):
+    candidate_path = ''
+    search_fields = ['full_name']
+    list_display = ['full_name', 'email', 'created_at']
+    ordering = ['-pk']
+
+
+@admin.register(CVSubmission)
+class CVSubmissionAdmin(CandidateSearchAdmin):
+    list_display = ['applicant_name', 'applicant_email', 'job', 'department', 'submitted_at', 'viewed']
+    list_select_related = ['job', 'department']
+    list_filter = ['viewed', 'department']
+    date_hierarchy = 'submitted_at'
+    ordering = ['-submitted_at']
+    autocomplete_fields = ['job']
+    raw_id_fields = ['candidate']
+
+    def delete_queryset(self, request, queryset):
+        # "Delete selected" skips CVSubmission.delete(), which keeps the folder counters.
+        CVSubmission.delete_with_counters(queryset)
+
+
+@admin.register(ApplicationLink)
+class ApplicationLinkAdmin(LargeTableAdmin):
+    list_display = ['token', 'job', 'created_by', 'expires_at', 'is_used', 'created_at']
+    list_select_related = ['job', 'created_by']
+    list_filter = ['is_used']
+    ordering = ['-pk']
+    search_fields = ['token']
+    search_help_text = "The full link token."
+    autocomplete_fields = ['job', 'created_by']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Exact token match on its unique index; anything else finds nothing.
+        if not search_term.strip():
+            return queryset, False
+        try:
+            token = uuid.UUID(search_term.strip())
+        except ValueError:
+            return queryset.none(), False
+        return queryset.filter(token=token), False
+
+
+@admin.register(DetailedApplication)
+class DetailedApplicationAdmin(CandidateSearchAdmin):
+    list_display = ['full_name', 'email', 'job_title', 'overall_status', 'submitted_at', 'viewed']
+    list_select_related = ['link__job']
+    list_filter = ['overall_status']
+    date_hierarchy = 'submitted_at'
+    ordering = ['-submitted_at']
+    raw_id_fields = ['link', 'candidate']
+
+    @admin.display(description='Job', ordering='link__job__title')
+    def job_title(self, application):
+        return application.link.job.title if application.link.job else "General Application"
+
+
+@admin.register(StageTransition)
+class StageTransitionAdmin(LargeTableAdmin):
+    """Read-only: the history is append-only."""
+    list_display = ['application_id', 'stage', 'from_status', 'to_status', 'job', 'changed_by', 'changed_at']
+    # Not the application: rows outlive it, and the join would hide them.
+    list_select_related = ['job', 'changed_by']
+    list_filter = ['stage', 'to_status']
+    ordering = ['-pk']
+    raw_id_fields = ['application', 'job', 'department', 'changed_by']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Interview)
+class InterviewAdmin(LargeTableAdmin):
+    list_display = ['application', 'stage', 'interviewer', 'start', 'end']
+    list_select_related = ['application', 'interviewer']
+    list_filter = ['stage']
+    ordering = ['-start']
+    raw_id_fields = ['application']
+    autocomplete_fields = ['interviewer']
+
+
+@admin.register(InterviewerAvailability)
+class InterviewerAvailabilityAdmin(admin.ModelAdmin):
+    list_display = ['interviewer', 'start', 'end', 'capacity']
+    list_select_related = ['interviewer']
+    ordering = ['-start']
+    autocomplete_fields = ['interviewer']
+
+
+@admin.register(CalendarFeed)
+class CalendarFeedAdmin(admin.ModelAdmin):
+    list_display = ['user', 'created_at']
+    list_select_related = ['user']
+    readonly_fields = ['token']
+    autocomplete_fields = ['user']
+
+
+@admin.register(ArchivedCVSubmission)
+class ArchivedCVSubmissionAdmin(CandidateSearchAdmin):
+    list_display = ['applicant_name', 'applicant_email', 'job', 'department', 'submitted_at', 'archived_at', 'cv_compressed']
+    list_select_related = ['job', 'department']
+    list_filter = ['cv_compressed', 'department']
+    ordering = ['-pk']
+    autocomplete_fields = ['job']
+    raw_id_fields = ['candidate']
+
+
+@admin.register(ArchivedApplication)
+class ArchivedApplicationAdmin(CandidateSearchAdmin):
+    list_display = ['full_name', 'email', 'job', 'overall_status', 'submitted_at', 'archived_at']
+    list_select_related = ['job']
+    list_filter = ['overall_status']
+    ordering = ['-pk']
+    autocomplete_fields = ['job', 'created_by']
+    raw_id_fields = ['candidate']
@@ -0,0 +1,157 @@
+import socketserver
+import statistics
+import threading
+import time
+import uuid
+from urllib.request import Request, urlopen
+
+
+def summarize(samples):
+    """p50/p95/p99/mean/max of a list of millisecond timings."""
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {'p50': value, 'p95': value, 'p99': value, 'mean': value, 'max': value}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {
+        'p50': round(cuts[49], 2),
+        'p95': round(cuts[94], 2),
+        'p99': round(cuts[98], 2),
+        'mean': round(statistics.mean(samples), 2),
+        'max': round(max(samples), 2),
+    }
+
+
+class SMTPSink:
+    """
+    Minimal local SMTP server that accepts and counts every message, used in
+    place of Office365 during load tests. Accepts any AUTH PLAIN login and
+    does not support STARTTLS (run the app with EMAIL_USE_TLS=0).
+    """
+
+    def __init__(self, host='127.0.0.1', port=1025):
+        self.messages = 0
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b'\r\n')
+
+            def handle(self):
+                self.reply('220 localhost SMTP sink')
+                for raw in self.rfile:
+                    command = raw.decode(errors='replace').strip().upper()
+                    if command.startswith('EHLO'):
+                        self.reply('250-localhost')
+                        self.reply('250 AUTH PLAIN')
+                    elif command.startswith('AUTH'):
+                        self.reply('235 Authentication successful')
+                    elif command == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        for line in self.rfile:
+                            if line in (b'.\r\n', b'.\n'):
+                                break
+                        sink.record()
+                        self.reply('250 OK')
+                    elif command == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        # HELO, MAIL FROM, RCPT TO, RSET, NOOP...
+                        self.reply('250 OK')
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self.server = Server((host, port), Handler)
+
+    def record(self):
+        with self._lock:
+            self.messages += 1
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def encode_multipart(fields, files):
+    """
+    Encodes form fields and files ({name: (filename, bytes, content type)})
+    as a multipart/form-data body. Returns (body, content type header).
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts += [
+            f'--{boundary}'.encode(),
+            f'Content-Disposition: form-data; name="{name}"'.encode(),
+            b'',
+            str(value).encode(),
+        ]
+    for name, (filename, content, content_type) in files.items():
+        parts += [
+            f'--{boundary}'.encode(),
+            f'Content-Disposition: form-data; name="{name}"; filename="{filename}"'.encode(),
+            f'Content-Type: {content_type}'.encode(),
+            b'',
+            content,
+        ]
+    parts += [f'--{boundary}--'.encode(), b'']
+    return b'\r\n'.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def throttled(body, kbps, chunk_size=8192):
+    """
+    Yields ``body`` in chunks paced at ``kbps`` kilobytes per second, like a
+    client on a slow uplink. Send it with an explicit Content-Length header.
+    """
+    delay = chunk_size / (kbps * 1024)
+    for offset in range(0, len(body), chunk_size):
+        yield body[offset:offset + chunk_size]
+        time.sleep(delay)
+
+
+class LatencyProbe:
+    """
+    Requests ``url`` in a loop on a background thread and records each
+    latency in milliseconds, to see how a page fares while uploads are busy.
+    ``headers``, if given, is called for the headers of each request.
+    """
+
+    def __init__(self, url, interval=0.05, headers=None):
+        self.url = url
+        self.interval = interval
+        self.headers = headers or dict
+        self.samples = []
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            try:
+                with urlopen(Request(self.url, headers=self.headers()), timeout=60) as response:
+                    response.read()
+            except OSError:
+                self.errors += 1
+            else:
+                self.samples.append((time.perf_counter() - start) * 1000)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def report(self):
+        return {'url': self.url, 'requests': len(self.samples), 'errors': self.errors,
+                'latency_ms': summarize(self.samples)}
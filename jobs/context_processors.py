@@ -0,0 +1,103 @@
+from django.core.cache import cache
+from django.db.models import Count, Q, Window
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+
+from .models import CVSubmission, DetailedApplication
+
+NOTIFICATIONS_GENERATION_KEY = 'hr-notifications:generation'
+# A safety net only: every write that changes the bell bumps the generation.
+NOTIFICATIONS_CACHE_SECONDS = 60 * 60
+# The bell lists the newest few of each kind and links to the full lists.
+NOTIFICATIONS_SHOWN = 10
+
+
+def invalidate_notifications():
+    """Drops every cached notification bell (new submissions and viewed ones change them)."""
+    try:
+        cache.incr(NOTIFICATIONS_GENERATION_KEY)
+    except ValueError:
+        cache.set(NOTIFICATIONS_GENERATION_KEY, 1, None)
+
+
+# How many rows matched before the LIMIT, read along with the newest ones.
+UNSEEN_TOTAL = Window(Count('pk'))
+
+
+def build_notifications(user):
+    unseen_cvs = CVSubmission.objects.filter(
+        (Q(job__created_by=user) | Q(job__isnull=True)),
+        viewed=False
+    ).select_related('job').order_by('-submitted_at').annotate(unseen=UNSEEN_TOTAL)
+
+    unseen_applications = DetailedApplication.objects.filter(
+        link__created_by=user,
+        viewed=False
+    ).select_related('link__job').order_by('-submitted_at').annotate(unseen=UNSEEN_TOTAL)
+
+    newest_cvs = list(unseen_cvs[:NOTIFICATIONS_SHOWN])
+    newest_apps = list(unseen_applications[:NOTIFICATIONS_SHOWN])
+
+    # Build quick-link URLs for the newest notifications
+    cvs_data = []
+    for cv in newest_cvs:
+        if cv.job:
+            title = cv.job.title
+            url = reverse('view-cv-submissions', kwargs={'job_pk': cv.job.id})
+        else:
+            title = "General Application"
+            url = reverse('view-general-submissions')
+
+        cvs_data.append({
+            "name": cv.applicant_name,
+            "job_title": title,
+            "url": url
+        })
+
+    apps_data = [
+        {
+            "name": app.full_name,
+            "job_title": app.link.job.title if app.link.job else "General",
+            "url": reverse('update-application-status', kwargs={'pk': app.pk})
+        }
+        for app in newest_apps
+    ]
+
+    return {
+        'cvs': cvs_data,
+        'cv_count': newest_cvs[0].unseen if newest_cvs else 0,
+        'apps': apps_data,
+        'app_count': newest_apps[0].unseen if newest_apps else 0,
+    }
+
+
+def get_unseen_notifications(user):
+    """The user's newest unseen CVs and applications and their counts, from the cache when nothing changed since."""
+    generation = cache.get(NOTIFICATIONS_GENERATION_KEY, 0)
+    cache_key = f'hr-notifications:{generation}:{user.pk}'
+    notifications = cache.get(cache_key)
+    if notifications is None:
+        notifications = build_notifications(user)
+        cache.set(cache_key, notifications, NOTIFICATIONS_CACHE_SECONDS)
+    return notifications
+
+
+def notifications(request):
+    """
+    The notification bell in base.html. Nothing is read, not even the
+    session, unless the template renders the bell for an HR user.
+    """
+    def load():
+        user = request.user
+        if not (user.is_authenticated and user.is_staff):
+            return {'cvs': [], 'cv_count': 0, 'apps': [], 'app_count': 0}
+        return get_unseen_notifications(user)
+
+    summary = SimpleLazyObject(load)
+    return {
+        'unseen_cvs': SimpleLazyObject(lambda: summary['cvs']),
+        'unseen_apps': SimpleLazyObject(lambda: summary['apps']),
+        'unseen_cv_count': SimpleLazyObject(lambda: summary['cv_count']),
+        'unseen_app_count': SimpleLazyObject(lambda: summary['app_count']),
+        'total_unseen_notifications': SimpleLazyObject(lambda: summary['cv_count'] + summary['app_count']),
+    }
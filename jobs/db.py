@@ -0,0 +1,116 @@
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, models
+
+
+def get_pool_stats(alias=DEFAULT_DB_ALIAS):
+    """
+    Returns the psycopg pool counters (size, available, waiting requests,
+    wait time...) for the given database alias, or None when pooling is off.
+    """
+    connection = connections[alias]
+    if not connection.settings_dict['OPTIONS'].get('pool'):
+        return None
+    return connection.pool.get_stats()
+
+
+# --- Read replica routing ---
+
+REPLICA_DB_ALIAS = 'replica'
+REPLICA_PIN_COOKIE = 'db_pin'
+
+# Set for the duration of a view wrapped in @use_replica.
+read_from_replica = ContextVar('read_from_replica', default=False)
+# Set by the router whenever the current request writes to the primary.
+wrote_to_primary = ContextVar('wrote_to_primary', default=False)
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads to the 'replica' alias while inside a @use_replica view,
+    everything else (and every write) goes to 'default'.
+    """
+    def db_for_read(self, model, **hints):
+        if read_from_replica.get() and REPLICA_DB_ALIAS in settings.DATABASES:
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Session saves happen on almost every request and don't need to pin
+        # the user to the primary.
+        if model._meta.label != 'sessions.Session':
+            wrote_to_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+
+def is_pinned_to_primary(request):
+    """True while the user is inside the read-your-writes window."""
+    return REPLICA_PIN_COOKIE in request.COOKIES
+
+
+def use_replica(view_func):
+    """
+    Serves the view's reads from the replica, unless the user wrote something
+    in the last DB_REPLICA_STICKY_SECONDS (then they must see their own write).
+    """
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if is_pinned_to_primary(request):
+            return view_func(request, *args, **kwargs)
+        token = read_from_replica.set(True)
+        try:
+            response = view_func(request, *args, **kwargs)
+            # Template responses evaluate their querysets lazily, so render
+            # them while still routed to the replica.
+            if getattr(response, 'is_rendered', True) is False:
+                response.render()
+            return response
+        finally:
+            read_from_replica.reset(token)
+    return _wrapped_view
+
+
+# --- Query budgets ---
+
+def query_budget(max_queries):
+    """
+    Declares the most SQL queries a view may run per request. Enforced by the
+    test suite and logged by QueryCountMiddleware when exceeded. Class-based
+    views set a ``query_budget`` attribute instead.
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def get_query_budget(view_func):
+    """Returns the declared query budget of a resolved view, or None."""
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        budget = getattr(getattr(view_func, 'view_class', None), 'query_budget', None)
+    return budget
+
+
+# --- Aggregates ---
+
+class Median(models.Aggregate):
+    """
+    PostgreSQL median (continuous percentile) of a numeric or interval
+    expression. Other backends have no equivalent: compute it in Python there.
+    """
+    function = 'PERCENTILE_CONT'
+    name = 'Median'
+    template = '%(function)s(0.5) WITHIN GROUP (ORDER BY %(expressions)s)'
+    allow_distinct = False
+
+    def as_sql(self, compiler, connection, **extra_context):
+        if connection.vendor != 'postgresql':
+            raise NotImplementedError("Median is only available on PostgreSQL.")
+        return super().as_sql(compiler, connection, **extra_context)
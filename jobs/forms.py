@@ -1,10 +1,14 @@
 from django import forms
-from .models import Job, CVSubmission, DetailedApplication, ApplicationLink
+from django.contrib.auth.models import User
+from .models import Job, CVSubmission, DetailedApplication, ApplicationLink, InterviewerAvailability
+
+def interviewer_queryset():
+    return User.objects.filter(is_staff=True, is_active=True).order_by('username')
 
 class JobForm(forms.ModelForm):
     class Meta:
         model = Job
-        fields = ['title','department', 'description', 'requirements', 'location', 'is_active']
+        fields = ['title','department', 'description', 'requirements', 'location', 'is_active', 'publish_at', 'close_at']
         widgets = {
             'title': forms.TextInput(attrs={'class': 'form-control'}),
             'department': forms.Select(attrs={'class': 'form-select'}),
@@ -12,6 +16,8 @@ class JobForm(forms.ModelForm):
             'requirements': forms.Textarea(attrs={'class': 'form-control', 'rows': 5}),
             'location': forms.TextInput(attrs={'class': 'form-control'}),
             'is_active': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+            'publish_at': forms.DateTimeInput(attrs={'type': 'datetime-local', 'class': 'form-control'}, format='%Y-%m-%dT%H:%M'),
+            'close_at': forms.DateTimeInput(attrs={'type': 'datetime-local', 'class': 'form-control'}, format='%Y-%m-%dT%H:%M'),
         }
 
 class CVSubmissionForm(forms.ModelForm):
@@ -25,6 +31,11 @@ class CVSubmissionForm(forms.ModelForm):
             'department': forms.Select(attrs={'class': 'form-select'}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # General CVs must pick a department; job CVs inherit the job's (the field is removed).
+        self.fields['department'].required = True
+
 class DetailedApplicationForm(forms.ModelForm):
     class Meta:
         model = DetailedApplication
@@ -59,7 +70,14 @@ class ApplicationStatusUpdateForm(forms.ModelForm):
     """
     Form for HR to update applicant details AND the status of each interview stage.
     Disables status fields based on the application's current stage.
+    Picking an interviewer books the interview date in their availability.
     """
+    interviewer = forms.ModelChoiceField(
+        queryset=interviewer_queryset(), required=False,
+        help_text="Book the interview in this interviewer's availability. Leave empty to only set the date.",
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+
     class Meta:
         model = DetailedApplication
         fields = [
@@ -89,6 +107,13 @@ class ApplicationStatusUpdateForm(forms.ModelForm):
         app = self.instance
         current_stage = app.current_stage
 
+        # The booking for the stage the application waits at, if any
+        self.booking = None
+        if app.pk and app.waiting_stage:
+            self.booking = app.interviews.filter(stage=app.waiting_stage).first()
+            if self.booking:
+                self.fields['interviewer'].initial = self.booking.interviewer_id
+
         # --- Logic for Status Fields ---
         stages_fields = {
             1: ['phone_status', 'phone_comment'],
@@ -119,3 +144,60 @@ class ApplicationStatusUpdateForm(forms.ModelForm):
         if app.overall_status != 'review':
              for field_name in self.fields:
                 self.fields[field_name].disabled = True
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('interviewer') and not cleaned_data.get('interview_date'):
+            self.add_error('interview_date', "Pick the interview time to book it with an interviewer.")
+        return cleaned_data
+
+class InterviewerAvailabilityForm(forms.ModelForm):
+    class Meta:
+        model = InterviewerAvailability
+        fields = ['start', 'end', 'capacity']
+        widgets = {
+            'start': forms.DateTimeInput(attrs={'type': 'datetime-local', 'class': 'form-control'}),
+            'end': forms.DateTimeInput(attrs={'type': 'datetime-local', 'class': 'form-control'}),
+            'capacity': forms.NumberInput(attrs={'class': 'form-control', 'min': 1}),
+        }
+        help_texts = {
+            'capacity': 'How many interviews can run at the same time in this window.',
+        }
+
+    def __init__(self, *args, interviewer, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instance.interviewer = interviewer
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start'), cleaned_data.get('end')
+        # Overlapping windows would count the same bookings twice.
+        if start and end and InterviewerAvailability.overlapping([self.instance.interviewer.pk], start, end).exists():
+            raise forms.ValidationError("This window overlaps one of your existing windows.")
+        return cleaned_data
+
+class InterviewPlanForm(forms.Form):
+    stage = forms.ChoiceField(
+        choices=DetailedApplication.STAGE_NAMES.items(),
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    job = forms.ModelChoiceField(
+        queryset=Job.objects.none(), required=False, empty_label="All jobs",
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    interviewers = forms.ModelMultipleChoiceField(
+        queryset=interviewer_queryset(),
+        widget=forms.SelectMultiple(attrs={'class': 'form-select'}),
+    )
+    count = forms.IntegerField(
+        min_value=1, max_value=100, initial=10, label="Candidates",
+        widget=forms.NumberInput(attrs={'class': 'form-control'}),
+    )
+    not_before = forms.DateTimeField(
+        required=False, label="Earliest start", help_text="Defaults to now.",
+        widget=forms.DateTimeInput(attrs={'type': 'datetime-local', 'class': 'form-control'}),
+    )
+
+    def __init__(self, *args, user, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['job'].queryset = Job.objects.filter(created_by=user).order_by('title')
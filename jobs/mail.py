@@ -0,0 +1,81 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.mail import get_connection
+from django.core.mail.backends.smtp import EmailBackend
+from django.db import connections
+
+from .metrics import EMAILS
+
+logger = logging.getLogger(__name__)
+
+# Sends the emails of async views after their response has gone out.
+_background = ThreadPoolExecutor(max_workers=4, thread_name_prefix='mail')
+
+
+class MetricsEmailBackend(EmailBackend):
+    """SMTP backend that counts sent and failed emails for /metrics."""
+
+    def send_messages(self, email_messages):
+        try:
+            sent = super().send_messages(email_messages)
+        except Exception:
+            EMAILS.labels('failed').inc(len(email_messages))
+            raise
+        EMAILS.labels('sent').inc(sent)
+        EMAILS.labels('failed').inc(len(email_messages) - sent)
+        return sent
+
+
+def send_each(email_messages):
+    """
+    Sends every message over a single SMTP connection and returns
+    ``[(message, error), ...]`` (error is None on success) so callers can
+    report results per recipient instead of failing the whole batch.
+    """
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        return [(message, exc) for message in email_messages]
+
+    results = []
+    try:
+        for message in email_messages:
+            message.connection = connection
+            try:
+                message.send()
+            except Exception as exc:
+                results.append((message, exc))
+            else:
+                results.append((message, None))
+    finally:
+        connection.close()
+    return results
+
+
+def send_in_background(build, *args):
+    """
+    Calls ``build(*args)`` on a background thread and sends the messages it
+    returns. Rendering and SMTP happen off the request, so failures can
+    only be logged (and counted by MetricsEmailBackend).
+
+    Not durable: the queue lives in this worker's memory, so emails still
+    waiting when the worker restarts are lost (without a log line).
+    """
+    def run():
+        try:
+            for message, error in send_each(build(*args)):
+                if error is not None:
+                    logger.error("Failed to send %r to %s: %s", message.subject, message.to, error)
+        except Exception:
+            logger.exception("Failed to build emails with %s", build.__name__)
+        finally:
+            connections.close_all()  # Don't hold a pooled connection while idle.
+
+    try:
+        return _background.submit(run)
+    except RuntimeError:
+        # The worker is shutting down and no longer takes new work.
+        logger.error("Dropped emails from %s: the mail pool is shut down", build.__name__)
+        return None
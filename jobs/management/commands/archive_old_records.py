@@ -0,0 +1,137 @@
+import gzip
+import os
+from datetime import timedelta
+from itertools import groupby
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.models import (
+    ApplicationLink, ArchivedApplication, ArchivedCVSubmission, CVFolderCount, CVSubmission, DetailedApplication,
+)
+
+ARCHIVE_CV_DIR = 'cvs/archive/'
+APPLICATION_FIELDS = [
+    'full_name', 'email', 'candidate_id', 'phone_number', 'cover_letter', 'submitted_at', 'interview_date',
+    'overall_status', 'phone_status', 'phone_comment', 'hr_status', 'hr_comment',
+    'technical_status', 'technical_comment', 'ceo_status', 'ceo_comment',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves CV submissions older than the retention window, and applications "
+        "that reached a final status and have no interview still to come, into "
+        "the archive tables in small batches. Safe to re-run: rows already "
+        "archived are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cv-days', type=int, default=365,
+                            help='Archive CV submissions older than this many days.')
+        parser.add_argument('--application-days', type=int, default=90,
+                            help='Archive hired/rejected applications submitted more than this many days ago.')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--compress', action='store_true',
+                            help='Store archived CV files gzip-compressed under cvs/archive/.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        old_cvs = CVSubmission.objects.filter(submitted_at__lt=now - timedelta(days=options['cv_days']))
+        closed_applications = DetailedApplication.objects.filter(
+            overall_status__in=[DetailedApplication.OVERALL_STATUS_HIRED, DetailedApplication.OVERALL_STATUS_REJECTED],
+            submitted_at__lt=now - timedelta(days=options['application_days']),
+        ).exclude(
+            # Its interviews go with it (the archive keeps interview_date and
+            # the stage history stays), so wait until the last one is over.
+            interviews__end__gt=now,
+        )
+
+        if options['dry_run']:
+            self.stdout.write(
+                f"{old_cvs.count()} CV submissions and {closed_applications.count()} "
+                f"closed applications would be archived."
+            )
+            return
+
+        cvs = self.drain(old_cvs, options['batch_size'],
+                         lambda batch: self.archive_cvs(batch, options['compress']))
+        applications = self.drain(closed_applications.select_related('link'), options['batch_size'],
+                                  self.archive_applications)
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {cvs} CV submissions and {applications} applications. "
+            f"Hot tables now hold {CVSubmission.objects.count()} CVs and "
+            f"{DetailedApplication.objects.count()} applications."
+        ))
+
+    def drain(self, queryset, batch_size, archive_batch):
+        total = 0
+        while True:
+            batch = list(queryset.order_by('pk')[:batch_size])
+            if not batch:
+                return total
+            archive_batch(batch)
+            total += len(batch)
+            self.stdout.write(f"  {queryset.model.__name__}: {total} archived so far.")
+
+    def archive_cvs(self, batch, compress):
+        # Files are written before the rows move, so a crash leaves at worst an
+        # unreferenced archive file that the next run reuses (same name).
+        archived_files = {cv.pk: self.compress_cv(cv) if compress else cv.cv_file.name for cv in batch}
+
+        with transaction.atomic():
+            ArchivedCVSubmission.objects.bulk_create([
+                ArchivedCVSubmission(
+                    original_id=cv.pk, job_id=cv.job_id, applicant_name=cv.applicant_name,
+                    applicant_email=cv.applicant_email, cv_file=archived_files[cv.pk],
+                    cv_compressed=compress and archived_files[cv.pk] != cv.cv_file.name,
+                    department_id=cv.department_id, candidate_id=cv.candidate_id,
+                    submitted_at=cv.submitted_at, viewed=cv.viewed,
+                )
+                for cv in batch
+            ], ignore_conflicts=True)
+            CVSubmission.objects.filter(pk__in=[cv.pk for cv in batch]).delete()
+            # Queryset deletes skip CVSubmission.delete(), so move the folder counters here.
+            for department_id, cvs in groupby(sorted(batch, key=lambda cv: cv.department_id or 0),
+                                              key=lambda cv: cv.department_id):
+                cvs = list(cvs)
+                CVFolderCount.adjust(department_id, total=-len(cvs),
+                                     unseen=-sum(not cv.viewed for cv in cvs))
+
+        if compress:
+            # Only drop originals that no remaining submission still points to.
+            originals = {cv.cv_file.name for cv in batch if archived_files[cv.pk] != cv.cv_file.name}
+            still_used = set(CVSubmission.objects.filter(cv_file__in=originals).values_list('cv_file', flat=True))
+            for name in originals - still_used:
+                default_storage.delete(name)
+
+    def compress_cv(self, cv):
+        """Writes a gzip copy of the CV under cvs/archive/ and returns its name."""
+        name = f"{ARCHIVE_CV_DIR}{cv.pk}_{os.path.basename(cv.cv_file.name)}.gz"
+        if default_storage.exists(name):
+            return name
+        try:
+            with default_storage.open(cv.cv_file.name, 'rb') as fh:
+                data = fh.read()
+        except (FileNotFoundError, OSError):
+            return cv.cv_file.name  # Keep the reference as-is; nothing to compress.
+        return default_storage.save(name, ContentFile(gzip.compress(data)))
+
+    def archive_applications(self, batch):
+        with transaction.atomic():
+            ArchivedApplication.objects.bulk_create([
+                ArchivedApplication(
+                    original_id=application.pk,
+                    job_id=application.link.job_id,
+                    created_by_id=application.link.created_by_id,
+                    token=application.link.token,
+                    **{field: getattr(application, field) for field in APPLICATION_FIELDS},
+                )
+                for application in batch
+            ], ignore_conflicts=True)
+            # Deleting the used links cascades to their applications and their (past) interviews.
+            ApplicationLink.objects.filter(pk__in=[application.link_id for application in batch]).delete()
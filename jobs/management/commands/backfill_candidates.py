@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.models import ArchivedApplication, ArchivedCVSubmission, Candidate, CVSubmission, DetailedApplication
+
+# Model -> (email field, name field)
+SOURCES = [
+    (CVSubmission, 'applicant_email', 'applicant_name'),
+    (DetailedApplication, 'email', 'full_name'),
+    (ArchivedCVSubmission, 'applicant_email', 'applicant_name'),
+    (ArchivedApplication, 'email', 'full_name'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Links CV submissions and applications (live and archived) that have no "
+        "candidate yet to the Candidate of their normalized email, creating "
+        "candidates as needed. Works in batches of a few queries each, so it "
+        "can run on a live database; safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be linked.')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            for model, _, _ in SOURCES:
+                self.stdout.write(f"{model.__name__}: {model.objects.filter(candidate__isnull=True).count()} to link.")
+            return
+
+        linked = sum(self.backfill(model, email_field, name_field, options['batch_size'])
+                     for model, email_field, name_field in SOURCES)
+        self.stdout.write(self.style.SUCCESS(
+            f"Linked {linked} rows. {Candidate.objects.count()} candidates in total."
+        ))
+
+    def backfill(self, model, email_field, name_field, batch_size):
+        total = 0
+        last_pk = 0
+        while True:
+            # Walk the primary key, so rows that cannot be linked are not read twice.
+            batch = list(
+                model.objects.filter(candidate__isnull=True, pk__gt=last_pk)
+                .order_by('pk').values_list('pk', email_field, name_field)[:batch_size]
+            )
+            if not batch:
+                return total
+            last_pk = batch[-1][0]
+            total += self.link_batch(model, batch)
+            self.stdout.write(f"  {model.__name__}: {total} linked so far.")
+
+    def link_batch(self, model, batch):
+        # Later rows win, so each new candidate gets the most recent name.
+        names = {Candidate.normalize_email(email): name for _, email, name in batch if email and email.strip()}
+        with transaction.atomic():
+            Candidate.objects.bulk_create(
+                [Candidate(email=email, full_name=name) for email, name in names.items()],
+                ignore_conflicts=True,
+            )
+            # ignore_conflicts leaves the pks unset, so read them back in one go.
+            candidates = dict(Candidate.objects.filter(email__in=names).values_list('email', 'pk'))
+            rows = [
+                model(pk=pk, candidate_id=candidates[Candidate.normalize_email(email)])
+                for pk, email, _ in batch if email and email.strip()
+            ]
+            model.objects.bulk_update(rows, ['candidate'])
+        return len(rows)
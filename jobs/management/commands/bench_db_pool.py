@@ -0,0 +1,77 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import ConnectionHandler
+
+from jobs.benchmarks import summarize
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures per-request database latency under concurrent load, once with "
+        "a fresh connection per request and once through the psycopg pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent workers.')
+        parser.add_argument('--requests', type=int, default=50, help='Simulated requests per worker.')
+
+    def handle(self, *args, **options):
+        base = connections.settings[DEFAULT_DB_ALIAS]
+        if base['ENGINE'] != 'django.db.backends.postgresql':
+            raise CommandError("The pooling benchmark needs the PostgreSQL backend.")
+
+        threads = options['threads']
+        modes = {
+            'per-request': {'CONN_MAX_AGE': 0, 'pool': None},
+            'pooled': {'CONN_MAX_AGE': 0, 'pool': {'min_size': threads, 'max_size': threads}},
+        }
+
+        for name, overrides in modes.items():
+            db_settings = deepcopy(base)
+            db_settings['CONN_MAX_AGE'] = overrides['CONN_MAX_AGE']
+            db_settings['OPTIONS'] = {k: v for k, v in db_settings['OPTIONS'].items() if k != 'pool'}
+            if overrides['pool']:
+                db_settings['OPTIONS']['pool'] = overrides['pool']
+
+            alias = f'bench_{name}'
+            handler = ConnectionHandler({alias: db_settings})
+            timings = self.run_mode(handler, alias, threads, options['requests'])
+            if overrides['pool']:
+                handler[alias].close_pool()
+            self.report(name, timings)
+
+    def run_mode(self, handler, alias, threads, requests):
+        def worker():
+            connection = handler[alias]
+            results = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                # Same cleanup Django runs on request_finished.
+                connection.close_if_unusable_or_obsolete()
+                results.append((time.perf_counter() - start) * 1000)
+            connection.close()
+            return results
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = [executor.submit(worker) for _ in range(threads)]
+            timings = [ms for future in futures for ms in future.result()]
+        elapsed = time.perf_counter() - started
+        return timings, elapsed
+
+    def report(self, name, result):
+        timings, elapsed = result
+        summary = summarize(timings)
+        self.stdout.write(
+            f"{name:<12} requests={len(timings)} "
+            f"mean={summary['mean']:.2f}ms p50={summary['p50']:.2f}ms "
+            f"p95={summary['p95']:.2f}ms p99={summary['p99']:.2f}ms "
+            f"throughput={len(timings) / elapsed:.0f} req/s"
+        )
@@ -0,0 +1,104 @@
+import json
+import subprocess
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobs.benchmarks import summarize
+from jobs.management.commands.seed_perf import PERF_USER_PREFIX
+
+# (URL name, query string, needs an HR login)
+READ_PATHS = [
+    ('job-list', '', False),
+    ('ajax-search-jobs', '?q=developer', False),
+    ('hr-dashboard', '', True),
+    ('view-detailed-applications', '', True),
+    ('ajax-search-applications', '?q=candidate', True),
+    ('cv-database-folders', '', True),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests the main read paths in-process and prints p50/p95/p99 latency "
+        "and query counts as JSON (run `manage.py seed_perf` first)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per path.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        hr_user = (
+            User.objects.filter(username__startswith=PERF_USER_PREFIX)
+            .annotate(job_count=Count('posted_jobs'))
+            .order_by('-job_count')
+            .first()
+        )
+        if hr_user is None:
+            raise CommandError("No seeded HR user found, run `manage.py seed_perf` first.")
+
+        host = next((h for h in settings.ALLOWED_HOSTS if h != '*'), 'testserver')
+        anonymous = Client(HTTP_HOST=host)
+        logged_in = Client(HTTP_HOST=host)
+        logged_in.force_login(hr_user)
+
+        results = {}
+        for name, query_string, needs_login in READ_PATHS:
+            client = logged_in if needs_login else anonymous
+            url = reverse(name) + query_string
+            for _ in range(options['warmup']):
+                client.get(url)
+            results[name] = self.measure(client, url, options['iterations'])
+
+        report = {
+            'commit': self.current_commit(),
+            'hr_user': hr_user.username,
+            'iterations': options['iterations'],
+            'paths': results,
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def measure(self, client, url, iterations):
+        timings, query_counts, statuses = [], [], set()
+        for _ in range(iterations):
+            with ExitStack() as stack:
+                captures = [
+                    stack.enter_context(CaptureQueriesContext(connection))
+                    for connection in connections.all()
+                ]
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(sum(len(capture) for capture in captures))
+            statuses.add(response.status_code)
+        return {
+            'url': url,
+            'status': sorted(statuses),
+            'latency_ms': summarize(timings),
+            'queries': {'min': min(query_counts), 'max': max(query_counts)},
+            'response_bytes': len(response.content),
+        }
+
+    def current_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,76 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+# Heavy, rarely used dependencies that must only be imported on demand.
+LAZY_MODULES = ('icalendar',)
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports job_portal.wsgi in a fresh interpreter under `python -X importtime` "
+        "and fails if the startup cost exceeds its budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Runs to take the median of.')
+        parser.add_argument('--budget-ms', type=float, default=800,
+                            help='Budget for importing job_portal.wsgi, warm-up included.')
+        parser.add_argument('--views-budget-ms', type=float, default=40,
+                            help='Budget for importing jobs.views.')
+        parser.add_argument('--top', type=int, default=10, help='Heaviest imports to list.')
+
+    def handle(self, *args, **options):
+        runs = [self.measure() for _ in range(options['repeat'])]
+
+        wsgi_ms = statistics.median(run.get('job_portal.wsgi', 0) for run in runs) / 1000
+        views_ms = statistics.median(run.get('jobs.views', 0) for run in runs) / 1000
+
+        self.stdout.write(f"job_portal.wsgi: {wsgi_ms:.1f}ms (budget {options['budget_ms']:.0f}ms)")
+        self.stdout.write(f"jobs.views:      {views_ms:.1f}ms (budget {options['views_budget_ms']:.0f}ms)")
+        self.stdout.write("Heaviest imports (last run, cumulative):")
+        heaviest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)
+        shown = [item for item in heaviest if item[0] != 'job_portal.wsgi'][:options['top']]
+        for module, us in shown:
+            self.stdout.write(f"  {us / 1000:8.1f}ms  {module}")
+
+        failures = [
+            f"{module} is imported at startup"
+            for module in LAZY_MODULES if module in runs[-1]
+        ]
+        if wsgi_ms > options['budget_ms']:
+            failures.append(f"job_portal.wsgi took {wsgi_ms:.1f}ms")
+        if views_ms > options['views_budget_ms']:
+            failures.append(f"jobs.views took {views_ms:.1f}ms")
+        if failures:
+            raise CommandError("Startup import budget exceeded: " + "; ".join(failures))
+
+    def measure(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            'DJANGO_SETTINGS_MODULE', 'job_portal.settings'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import job_portal.wsgi'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"Importing job_portal.wsgi failed:\n{result.stderr[-2000:]}")
+
+        # Cumulative microseconds per module. Nested imports are skipped, except
+        # for the project's own modules and the ones that should be lazy.
+        cumulative = {}
+        for line in result.stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if not match:
+                continue
+            depth = len(match.group(3)) // 2
+            module = match.group(4)
+            if depth <= 1 or module.startswith('jobs.') or module in LAZY_MODULES:
+                cumulative[module] = int(match.group(2))
+        return cumulative
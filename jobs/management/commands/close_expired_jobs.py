@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.views import invalidate_hr_dashboards
+
+
+class Command(BaseCommand):
+    help = (
+        "Deactivates the jobs whose close_at has passed, one UPDATE per batch. "
+        "Meant to run every few minutes (cron); safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Only count the jobs that would be closed.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        # Served by job_closing_idx (active jobs with a closing date).
+        expired = Job.objects.filter(is_active=True, close_at__lte=now)
+
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} jobs would be closed.")
+            return
+
+        closed = 0
+        while True:
+            count = (
+                Job.objects.filter(pk__in=expired.order_by('close_at').values('pk')[:options['batch_size']])
+                .update(is_active=False, updated_at=now)
+            )
+            if not count:
+                break
+            closed += count
+            # Once per batch, not per job: the dashboards show each job's status.
+            invalidate_hr_dashboards()
+            self.stdout.write(f"  {closed} closed so far.")
+
+        self.stdout.write(self.style.SUCCESS(f"Closed {closed} expired jobs."))
@@ -0,0 +1,355 @@
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import timedelta
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.benchmarks import LatencyProbe, SMTPSink, encode_multipart, summarize, throttled
+from jobs.models import (
+    ApplicationLink, Candidate, CVFolderCount, CVSubmission, DetailedApplication, Department, Job, StageTransition,
+)
+
+LOADTEST_EMAIL_DOMAIN = 'loadtest.example.com'
+
+
+class NoRedirect(HTTPRedirectHandler):
+    """Surface redirects as responses: a 302 is how a CV upload succeeds."""
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Visitor:
+    """One applicant's browser: its cookies, CSRF token and the form it will post."""
+
+    def __init__(self, kind, arg, url, post_url, fields, files, client_ip):
+        self.kind = kind
+        self.arg = arg
+        self.url = url
+        self.post_url = post_url
+        self.fields = fields
+        self.files = files
+        self.cookie_jar = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookie_jar), NoRedirect)
+        # Its own throttle bucket, as a separate applicant would have (see the help).
+        self.opener.addheaders.append(('X-Forwarded-For', client_ip))
+        self.csrf_token = None
+        self.error = None
+
+
+class LockWaitSampler:
+    """Polls pg_locks in the background to record how many queries wait on locks."""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        # Runs on its own thread, so this is a dedicated connection.
+        with connections['default'].cursor() as cursor:
+            while not self._stop.is_set():
+                cursor.execute("SELECT count(*) FROM pg_locks WHERE NOT granted")
+                self.samples.append(cursor.fetchone()[0])
+                self._stop.wait(self.interval)
+        connections['default'].close()
+
+    def __enter__(self):
+        self.deadlocks_before = self.deadlocks()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.deadlocks_after = self.deadlocks()
+
+    def deadlocks(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()")
+            return cursor.fetchone()[0]
+
+    def report(self):
+        waiting = [count for count in self.samples if count]
+        return {
+            'samples': len(self.samples),
+            'samples_with_waits': len(waiting),
+            'max_waiting': max(self.samples, default=0),
+            'mean_waiting': round(sum(self.samples) / len(self.samples), 2) if self.samples else 0,
+            'deadlocks': self.deadlocks_after - self.deadlocks_before,
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires concurrent multipart CV uploads and tokenized application submits "
+        "(including duplicate submits per token) at a running server, then "
+        "checks that no link was used twice and no submission was lost. Run the "
+        "server against the same database with EMAIL_HOST=127.0.0.1 "
+        "EMAIL_PORT=<--smtp-port> EMAIL_USE_TLS=0 so emails land in the local sink. "
+        "To compare the upload paths under slow clients, run once with "
+        "--endpoint sync against `gunicorn job_portal.wsgi` (sync workers) and once "
+        "with --endpoint async against `uvicorn job_portal.asgi:application`, both "
+        "with --upload-kbps set, and compare the job-list probe latency. "
+        "Every simulated applicant sends its own X-Forwarded-For address, so run "
+        "the server with TRUSTED_PROXY_HOPS=1 to give each one its own "
+        "THROTTLE_RATES bucket, or raise THROTTLE_CV_UPLOAD, "
+        "THROTTLE_APPLICATION_SUBMIT and THROTTLE_PAGES for the run; otherwise "
+        "most requests get a 429 and the not_throttled check fails."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--cv-uploads', type=int, default=200)
+        parser.add_argument('--links', type=int, default=100)
+        parser.add_argument('--duplicates', type=int, default=2,
+                            help='Concurrent submits per link (a double-click is 2).')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--cv-size', type=int, default=200_000, help='Bytes per uploaded CV.')
+        parser.add_argument('--endpoint', choices=['sync', 'async'], default='sync',
+                            help='Post to the form pages (sync) or to the async /submit/ endpoints.')
+        parser.add_argument('--upload-kbps', type=float, default=0,
+                            help='Throttle each upload to this many KB/s to simulate slow clients (0 = unthrottled).')
+        parser.add_argument('--smtp-port', type=int, default=1025)
+        parser.add_argument('--settle', type=float, default=1.0,
+                            help='Seconds to wait for late emails before counting.')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated rows.')
+
+    def handle(self, *args, **options):
+        self.base_url = options['base_url'].rstrip('/')
+        self.run_id = uuid.uuid4().hex[:8]
+        self.cv_payload = b'%PDF-1.4\n' + b'0' * max(options['cv_size'] - 16, 0) + b'\n%%EOF\n'
+        self.endpoint = options['endpoint']
+        self.upload_kbps = options['upload_kbps']
+        self.client_ips = (f'10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}' for n in itertools.count(1))
+        self.client_ip_lock = threading.Lock()
+
+        job, links = self.prepare(options['links'])
+        visitors = [self.visitor(job, 'cv', i) for i in range(options['cv_uploads'])]
+        visitors += [self.visitor(job, 'application', link) for link in links]
+
+        sampler = LockWaitSampler() if connection.vendor == 'postgresql' else None
+        try:
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+                # Untimed: every applicant has the form open before the storm.
+                list(executor.map(self.load_form, visitors))
+
+            # Duplicate submits of a link share one browser, like a double-click.
+            submits = [v for v in visitors for _ in range(options['duplicates'] if v.kind == 'application' else 1)]
+            random.shuffle(submits)
+
+            with SMTPSink(port=options['smtp_port']) as sink:
+                # Measures how a cheap page fares while the uploads hold the server.
+                with sampler or nullcontext(), LatencyProbe(
+                    self.base_url + reverse('job-list'),
+                    headers=lambda: {'X-Forwarded-For': self.next_client_ip()},
+                ) as probe:
+                    started = time.perf_counter()
+                    with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+                        results = list(executor.map(self.submit, submits))
+                    elapsed = time.perf_counter() - started
+                time.sleep(options['settle'])
+                emails_received = sink.messages
+
+            report = self.build_report(job, links, results, elapsed, emails_received, sampler)
+            report['probe'] = probe.report()
+        finally:
+            if not options['keep']:
+                self.cleanup(job, links)
+
+        self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+        failed = [name for name, check in report['checks'].items() if not check['passed']]
+        if failed:
+            raise CommandError("Load test integrity checks failed: " + ", ".join(failed))
+
+    # --- Fixtures ---
+
+    def prepare(self, link_count):
+        hr_user, _ = User.objects.get_or_create(username='loadtest_hr', defaults={'is_staff': True})
+        job = Job.objects.create(
+            title=f'Load test {self.run_id}', department=Department.objects.filter(slug='it').first(), description='Load test job.',
+            requirements='None.', location='Cairo', created_by=hr_user,
+        )
+        links = ApplicationLink.objects.bulk_create([
+            ApplicationLink(job=job, created_by=hr_user, expires_at=timezone.now() + timedelta(days=1))
+            for _ in range(link_count)
+        ])
+        return job, links
+
+    def cleanup(self, job, links):
+        run_emails = f'.{self.run_id}@{LOADTEST_EMAIL_DOMAIN}'
+        CVSubmission.objects.filter(applicant_email__endswith=run_emails).delete()
+        CVFolderCount.rebuild()  # The queryset delete skips the per-CV counter updates.
+        # The stage history has no FK constraint, so the link delete below
+        # would leave it behind to count in stage_metrics.
+        StageTransition.objects.filter(
+            application__in=DetailedApplication.objects.filter(link__in=links).values('pk')
+        ).delete()
+        Candidate.objects.filter(email__endswith=run_emails).delete()
+        ApplicationLink.objects.filter(pk__in=[link.pk for link in links]).delete()
+        job.delete()
+
+    # --- Requests ---
+
+    def next_client_ip(self):
+        with self.client_ip_lock:
+            return next(self.client_ips)
+
+    def visitor(self, job, kind, arg):
+        if kind == 'cv':
+            url = self.base_url + reverse('job-detail', kwargs={'pk': job.pk})
+            post_url = self.base_url + reverse('submit-cv', kwargs={'pk': job.pk})
+            fields = {
+                'applicant_name': f'Load Test {arg}',
+                'applicant_email': f'cv{arg}.{self.run_id}@{LOADTEST_EMAIL_DOMAIN}',
+            }
+            files = {'cv_file': (f'cv_{arg}.pdf', self.cv_payload, 'application/pdf')}
+        else:
+            url = self.base_url + reverse('application-form', kwargs={'token': arg.token})
+            post_url = self.base_url + reverse('submit-application', kwargs={'token': arg.token})
+            fields = {
+                'full_name': 'Load Test Candidate',
+                'email': f'app{arg.pk}.{self.run_id}@{LOADTEST_EMAIL_DOMAIN}',
+                'phone_number': '01000000000',
+                'cover_letter': 'Submitted by the load test.',
+            }
+            files = {}
+        return Visitor(kind, arg, url, post_url if self.endpoint == 'async' else url, fields, files,
+                       self.next_client_ip())
+
+    def load_form(self, visitor):
+        try:
+            status, _ = self.open(visitor.opener, Request(visitor.url))
+        except URLError as exc:
+            visitor.error = str(exc.reason)
+            return
+        cookies = {cookie.name: cookie.value for cookie in visitor.cookie_jar}
+        visitor.csrf_token = cookies.get(settings.CSRF_COOKIE_NAME)
+        if visitor.csrf_token is None:
+            visitor.error = f"GET returned {status} without a CSRF cookie"
+
+    def submit(self, visitor):
+        result = {'kind': visitor.kind, 'link': visitor.arg.pk if visitor.kind == 'application' else None}
+        if visitor.csrf_token is None:
+            result.update(status=None, outcome='error', error=visitor.error)
+            return result
+
+        body, content_type = encode_multipart(visitor.fields, visitor.files)
+        headers = {
+            'Content-Type': content_type,
+            'Content-Length': str(len(body)),
+            'X-CSRFToken': visitor.csrf_token,
+            'Referer': visitor.url,
+        }
+        data = throttled(body, self.upload_kbps) if self.upload_kbps else body
+        request = Request(visitor.post_url, data=data, method='POST', headers=headers)
+        start = time.perf_counter()
+        try:
+            status, content = self.open(visitor.opener, request)
+        except URLError as exc:
+            result.update(status=None, outcome='error', error=str(exc.reason))
+            return result
+        result['ms'] = (time.perf_counter() - start) * 1000
+        result['status'] = status
+        result['outcome'] = self.classify(visitor.kind, status, content)
+        return result
+
+    def open(self, opener, request):
+        try:
+            with opener.open(request, timeout=60) as response:
+                return response.status, response.read()
+        except HTTPError as exc:
+            return exc.code, exc.read()
+
+    def classify(self, kind, status, content):
+        if status == 429:
+            return 'throttled'
+        if kind == 'cv':
+            return 'ok' if status == 302 else 'error'
+        if status == 200 and b'successfully submitted' in content:
+            return 'ok'
+        if status == 200 and b'Invalid Link' in content:
+            return 'rejected'  # Link already used: expected for duplicate submits.
+        return 'error'
+
+    # --- Report ---
+
+    def build_report(self, job, links, results, elapsed, emails_received, sampler):
+        report = {
+            'run_id': self.run_id, 'endpoint': self.endpoint, 'upload_kbps': self.upload_kbps,
+            'elapsed_s': round(elapsed, 2), 'requests': len(results),
+        }
+        for kind in ('cv', 'application'):
+            kind_results = [r for r in results if r['kind'] == kind]
+            outcomes = {}
+            for r in kind_results:
+                outcomes[r['outcome']] = outcomes.get(r['outcome'], 0) + 1
+            report[kind] = {
+                'requests': len(kind_results),
+                'outcomes': outcomes,
+                'statuses': sorted({str(r['status']) for r in kind_results}),
+                'error_rate': round(outcomes.get('error', 0) / len(kind_results), 4) if kind_results else 0,
+                'throughput_rps': round(len(kind_results) / elapsed, 1) if elapsed else None,
+                'latency_ms': summarize([r['ms'] for r in kind_results if 'ms' in r]),
+                'errors': sorted({r['error'] for r in kind_results if r.get('error')})[:5],
+            }
+
+        cv_ok = report['cv']['outcomes'].get('ok', 0)
+        stored_cvs = CVSubmission.objects.filter(
+            job=job, applicant_email__endswith=f'.{self.run_id}@{LOADTEST_EMAIL_DOMAIN}'
+        ).count()
+
+        accepted_per_link = {}
+        for r in results:
+            if r['kind'] == 'application' and r['outcome'] == 'ok':
+                accepted_per_link[r['link']] = accepted_per_link.get(r['link'], 0) + 1
+        stored_links = set(
+            DetailedApplication.objects.filter(link__in=links).values_list('link_id', flat=True)
+        )
+        used_links = set(
+            ApplicationLink.objects.filter(pk__in=[link.pk for link in links], is_used=True)
+            .values_list('pk', flat=True)
+        )
+        app_ok = sum(accepted_per_link.values())
+
+        throttled_requests = sum(1 for r in results if r['outcome'] == 'throttled')
+        report['checks'] = {
+            'not_throttled': {
+                # Start the server with TRUSTED_PROXY_HOPS=1 (see --help).
+                'passed': throttled_requests == 0, 'throttled': throttled_requests,
+            },
+            'no_link_accepted_twice': {
+                'passed': all(count == 1 for count in accepted_per_link.values()),
+                'links': sorted(pk for pk, count in accepted_per_link.items() if count > 1),
+            },
+            'no_cv_lost': {'passed': stored_cvs == cv_ok, 'accepted': cv_ok, 'stored': stored_cvs},
+            'no_application_lost': {
+                'passed': set(accepted_per_link) == stored_links,
+                'accepted': len(accepted_per_link), 'stored': len(stored_links),
+            },
+            'stored_applications_mark_link_used': {
+                'passed': stored_links <= used_links,
+                'unmarked': len(stored_links - used_links),
+            },
+            'emails_delivered': {
+                # Each accepted submission sends one email to HR and one to the applicant.
+                'passed': emails_received == 2 * (cv_ok + app_ok),
+                'expected': 2 * (cv_ok + app_ok), 'received': emails_received,
+            },
+        }
+        report['lock_waits'] = sampler.report() if sampler else None
+        return report
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from jobs.models import CVFolderCount
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts CV submissions per department and repairs any drift in the "
+        "CV folder counters (e.g. after raw SQL, bulk imports or deleting a "
+        "department)."
+    )
+
+    def handle(self, *args, **options):
+        corrections = CVFolderCount.rebuild()
+        for department_id, (total, unseen) in sorted(corrections.items()):
+            self.stdout.write(f"  folder {department_id}: set to {total} CVs, {unseen} unseen")
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled CV folder counters: {len(corrections)} folder(s) corrected."
+        ))
@@ -0,0 +1,172 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.models import ApplicationLink, CVFolderCount, CVSubmission, DetailedApplication, Department, Job
+
+PERF_USER_PREFIX = 'perf_hr_'
+PERF_EMAIL_DOMAIN = 'perf.example.com'
+FAKE_CV_COUNT = 10
+LOCATIONS = ['Cairo', 'Giza', '6th of October', 'Alexandria', 'Remote']
+STAGES = ['phone', 'hr', 'technical', 'ceo']
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds production-like volumes of jobs, CVs, application links and "
+        "detailed applications (all with bulk_create) for performance work."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hr-users', type=int, default=5)
+        parser.add_argument('--jobs', type=int, default=200)
+        parser.add_argument('--cvs', type=int, default=20000)
+        parser.add_argument('--links', type=int, default=6000, help='Includes the links used by applications.')
+        parser.add_argument('--applications', type=int, default=4000)
+        parser.add_argument('--general-ratio', type=float, default=0.2,
+                            help='Share of CVs/links not tied to a job.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--clear', action='store_true', help='Delete previously seeded data first.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        applications = min(options['applications'], options['links'])
+
+        if options['clear']:
+            self.clear()
+
+        with transaction.atomic():
+            hr_users = self.seed_hr_users(options['hr_users'])
+            jobs = self.seed_jobs(rng, hr_users, options['jobs'], batch_size)
+            cv_files = self.seed_cv_files()
+            self.seed_cvs(rng, jobs, cv_files, options['cvs'], options['general_ratio'], batch_size)
+            links = self.seed_links(rng, hr_users, jobs, options['links'], applications,
+                                    options['general_ratio'], batch_size)
+            self.seed_applications(rng, links[:applications], batch_size)
+            # bulk_create skips CVSubmission.save(), so recount the CV folders once.
+            CVFolderCount.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(hr_users)} HR users, {len(jobs)} jobs, {options['cvs']} CVs, "
+            f"{len(links)} links and {applications} applications."
+        ))
+
+    def clear(self):
+        cvs, _ = CVSubmission.objects.filter(applicant_email__endswith=f'@{PERF_EMAIL_DOMAIN}').delete()
+        # Jobs, links and applications cascade from their HR user.
+        rest, _ = User.objects.filter(username__startswith=PERF_USER_PREFIX).delete()
+        CVFolderCount.rebuild()
+        self.stdout.write(f"Cleared previous seed data ({cvs + rest} rows).")
+
+    def seed_hr_users(self, count):
+        users = []
+        for i in range(count):
+            user, created = User.objects.get_or_create(
+                username=f'{PERF_USER_PREFIX}{i}',
+                defaults={'is_staff': True, 'email': f'hr{i}@{PERF_EMAIL_DOMAIN}'},
+            )
+            if created:
+                user.set_unusable_password()
+                user.save(update_fields=['password'])
+            users.append(user)
+        return users
+
+    def seed_jobs(self, rng, hr_users, count, batch_size):
+        departments = list(Department.objects.all())
+        jobs = [
+            Job(
+                title=f'{rng.choice(["Senior", "Junior", "Lead", ""])} {rng.choice(["Developer", "Accountant", "Engineer", "Specialist", "Manager"])} {i}'.strip(),
+                department=rng.choice(departments),
+                description='Perf seed job description. ' * rng.randint(5, 40),
+                requirements='Perf seed requirements. ' * rng.randint(3, 15),
+                location=rng.choice(LOCATIONS),
+                is_active=rng.random() < 0.8,
+                created_by=rng.choice(hr_users),
+            )
+            for i in range(count)
+        ]
+        return Job.objects.bulk_create(jobs, batch_size=batch_size)
+
+    def seed_cv_files(self):
+        """A handful of tiny PDFs shared by every seeded CV."""
+        names = []
+        for i in range(FAKE_CV_COUNT):
+            name = f'cvs/perf/cv_{i}.pdf'
+            if not default_storage.exists(name):
+                content = b'%PDF-1.4\n% perf seed CV ' + str(i).encode() + b'\n%%EOF\n'
+                name = default_storage.save(name, ContentFile(content))
+            names.append(name)
+        return names
+
+    def seed_cvs(self, rng, jobs, cv_files, count, general_ratio, batch_size):
+        departments = list(Department.objects.all())
+        batch = []
+        for i in range(count):
+            job = None if rng.random() < general_ratio else rng.choice(jobs)
+            batch.append(CVSubmission(
+                job=job,
+                applicant_name=f'Applicant {i}',
+                applicant_email=f'applicant{i}@{PERF_EMAIL_DOMAIN}',
+                cv_file=cv_files[i % len(cv_files)],
+                department=job.department if job else rng.choice(departments),
+                viewed=rng.random() < 0.7,
+            ))
+            if len(batch) >= batch_size:
+                CVSubmission.objects.bulk_create(batch)
+                batch = []
+        CVSubmission.objects.bulk_create(batch)
+
+    def seed_links(self, rng, hr_users, jobs, count, used, general_ratio, batch_size):
+        now = timezone.now()
+        links = []
+        for i in range(count):
+            job = None if rng.random() < general_ratio else rng.choice(jobs)
+            links.append(ApplicationLink(
+                job=job,
+                created_by=job.created_by if job else rng.choice(hr_users),
+                # Roughly a third of the links are already expired.
+                expires_at=now + timedelta(days=rng.randint(-20, 40)),
+                is_used=i < used,
+            ))
+        return ApplicationLink.objects.bulk_create(links, batch_size=batch_size)
+
+    def seed_applications(self, rng, links, batch_size):
+        batch = []
+        for i, link in enumerate(links):
+            application = DetailedApplication(
+                link=link,
+                full_name=f'Candidate {i}',
+                email=f'candidate{i}@{PERF_EMAIL_DOMAIN}',
+                phone_number=f'010{i:08d}',
+                cover_letter='Perf seed cover letter.',
+                viewed=rng.random() < 0.7,
+            )
+            self.assign_stage(rng, application)
+            batch.append(application)
+            if len(batch) >= batch_size:
+                DetailedApplication.objects.bulk_create(batch)
+                batch = []
+        DetailedApplication.objects.bulk_create(batch)
+
+    def assign_stage(self, rng, application):
+        """Statuses that respect the sequential stage rules of the status form."""
+        reached = rng.randint(0, len(STAGES))
+        for stage in STAGES[:reached]:
+            setattr(application, f'{stage}_status', DetailedApplication.STATUS_PASSED)
+
+        if reached == len(STAGES):
+            application.overall_status = DetailedApplication.OVERALL_STATUS_HIRED
+        elif rng.random() < 0.3:
+            setattr(application, f'{STAGES[reached]}_status', DetailedApplication.STATUS_FAILED)
+            application.overall_status = DetailedApplication.OVERALL_STATUS_REJECTED
+        elif rng.random() < 0.3:
+            application.interview_date = timezone.now() + timedelta(
+                days=rng.randint(0, 21), hours=rng.randint(9, 16))
@@ -0,0 +1,108 @@
+import json
+import statistics
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, DurationField, Exists, ExpressionWrapper, F, Min, OuterRef, Q
+from django.db.models.functions import Now, TruncWeek
+from django.utils import timezone
+
+from jobs.db import Median
+from jobs.models import DetailedApplication, Department, Job, StageTransition
+
+
+def hours(duration):
+    return round(duration.total_seconds() / 3600, 1) if duration is not None else None
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports interview pipeline metrics from the stage transition history "
+        "as JSON: median time-in-stage per job or department, weekly throughput "
+        "per stage and the current backlog age per stage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group-by', choices=['job', 'department'], default='department')
+        parser.add_argument('--days', type=int, default=90,
+                            help='Only count stage decisions made in this many days.')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+        report = {
+            'group_by': options['group_by'],
+            'days': options['days'],
+            'time_in_stage_hours': self.time_in_stage(options['group_by'], since),
+            'throughput': self.throughput(since),
+            'backlog': self.backlog(),
+        }
+        self.stdout.write(json.dumps(report, indent=2, sort_keys=True, default=str))
+
+    def medians(self, queryset, fields, value):
+        """{(field values...): (median, count)}, in SQL on PostgreSQL and in Python elsewhere."""
+        if connection.vendor == 'postgresql':
+            rows = queryset.values(*fields).annotate(median=Median(value), count=Count('pk'))
+            return {tuple(row[f] for f in fields): (row['median'], row['count']) for row in rows}
+        samples = defaultdict(list)
+        for *key, sample in queryset.values_list(*fields, value):
+            samples[tuple(key)].append(sample)
+        return {key: (statistics.median(values), len(values)) for key, values in samples.items()}
+
+    def time_in_stage(self, group_by, since):
+        # Decisions only: the row logged on submission has no time in stage.
+        decisions = StageTransition.objects.order_by().filter(
+            changed_at__gte=since, stage_entered_at__isnull=False,
+        ).exclude(from_status=StageTransition.ENTERED).annotate(
+            time_in_stage=ExpressionWrapper(F('changed_at') - F('stage_entered_at'), output_field=DurationField()),
+        )
+        model = Job if group_by == 'job' else Department
+        names = dict(model.objects.values_list('pk', 'title' if group_by == 'job' else 'name'))
+
+        report = defaultdict(dict)
+        for (group_id, stage), (median, count) in self.medians(decisions, [f'{group_by}_id', 'stage'], 'time_in_stage').items():
+            group = names.get(group_id, 'General' if group_id is None else f'#{group_id}')
+            report[group][stage] = {'median': hours(median), 'decisions': count}
+        return report
+
+    def throughput(self, since):
+        rows = (
+            StageTransition.objects.order_by()
+            .filter(changed_at__gte=since).exclude(from_status=StageTransition.ENTERED)
+            .values('stage', week=TruncWeek('changed_at'))
+            .annotate(
+                passed=Count('pk', filter=Q(to_status=DetailedApplication.STATUS_PASSED)),
+                failed=Count('pk', filter=Q(to_status=DetailedApplication.STATUS_FAILED)),
+            )
+        )
+        report = defaultdict(dict)
+        for row in rows:
+            report[row['stage']][row['week'].date().isoformat()] = {'passed': row['passed'], 'failed': row['failed']}
+        return report
+
+    def backlog(self):
+        # Where every application stands: the stage its latest transition leaves it waiting at.
+        # History outlives deleted applications, so only count the live ones
+        # (archived applications are decided, so none of them waits anywhere).
+        waiting = (
+            StageTransition.latest().order_by()
+            .annotate(waiting_stage=StageTransition.waiting_stage())
+            .filter(waiting_stage__isnull=False)
+            .filter(Exists(DetailedApplication.objects.filter(pk=OuterRef('application_id'))))
+            .annotate(age=ExpressionWrapper(Now() - F('changed_at'), output_field=DurationField()))
+        )
+        counts = {
+            row['waiting_stage']: row
+            for row in waiting.values('waiting_stage').annotate(count=Count('pk'), oldest=Min('changed_at'))
+        }
+        medians = self.medians(waiting, ['waiting_stage'], 'age')
+        now = timezone.now()
+        return {
+            stage: {
+                'waiting': row['count'],
+                'median_age_hours': hours(medians[(stage,)][0]),
+                'oldest_age_hours': hours(now - row['oldest']),
+            }
+            for stage, row in counts.items()
+        }
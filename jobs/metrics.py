@@ -0,0 +1,77 @@
+"""
+Prometheus instrumentation for the job portal.
+
+Under a prefork server (several worker processes) set PROMETHEUS_MULTIPROC_DIR
+to an empty, writable directory before the workers start: every process then
+writes its samples to shared files there and /metrics aggregates them.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+    generate_latest, multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    'jobs_request_latency_seconds',
+    'Request latency by URL name.',
+    ['view', 'method'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERY_TIME = Histogram(
+    'jobs_request_db_seconds',
+    'Database time spent per request, by URL name.',
+    ['view'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_QUERIES = Histogram(
+    'jobs_request_db_queries',
+    'SQL queries run per request, by URL name.',
+    ['view'],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+UPLOAD_SIZE = Histogram(
+    'jobs_upload_size_bytes',
+    'Size of uploaded files.',
+    ['kind'],
+    buckets=(50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000),
+)
+CV_SUBMISSIONS = Counter(
+    'jobs_cv_submissions',
+    'CVs submitted, for a job or general.',
+    ['kind'],
+)
+APPLICATIONS = Counter(
+    'jobs_applications',
+    'Detailed applications submitted through a link.',
+    ['kind'],
+)
+EMAILS = Counter(
+    'jobs_emails',
+    'Emails handed to the mail server, by outcome (sent/failed).',
+    ['outcome'],
+)
+
+THROTTLED = Counter(
+    'jobs_throttle_requests',
+    'Requests checked by the rate limiter, by scope and outcome (allowed/throttled).',
+    ['scope', 'outcome'],
+)
+
+
+def observe_request(view_name, method, duration, db_time, queries):
+    view = view_name or 'unresolved'
+    REQUEST_LATENCY.labels(view, method).observe(duration)
+    DB_QUERY_TIME.labels(view).observe(db_time)
+    DB_QUERIES.labels(view).observe(queries)
+
+
+def render_latest():
+    """Returns (body, content type) for the metrics endpoint."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,151 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import metrics
+from .db import REPLICA_PIN_COOKIE, get_query_budget, wrote_to_primary
+
+query_logger = logging.getLogger('jobs.queries')
+
+# The query counter of the current request. A context variable rather than a
+# per-request wrapper because under ASGI the view's queries run on other
+# threads, with their own connection objects, which inherit the context.
+request_query_stats = ContextVar('request_query_stats', default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    stats = request_query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats['queries'] += 1
+        stats['db_time'] += time.perf_counter() - start
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pins a user to the primary database for a few seconds after any request
+    that wrote to it, so replica lag never hides their own changes.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = wrote_to_primary.set(False)
+        try:
+            response = self.get_response(request)
+            wrote = wrote_to_primary.get()
+        finally:
+            wrote_to_primary.reset(token)
+        return self.pin(response, wrote)
+
+    async def __acall__(self, request):
+        token = wrote_to_primary.set(False)
+        try:
+            response = await self.get_response(request)
+            wrote = wrote_to_primary.get()
+        finally:
+            wrote_to_primary.reset(token)
+        return self.pin(response, wrote)
+
+    def pin(self, response, wrote):
+        if wrote:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.DB_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class QueryCountMiddleware:
+    """
+    Counts the SQL queries and database time of every request, logs one
+    structured line per view and feeds the per-view Prometheus histograms.
+    Staff users also get a Server-Timing header, visible in the browser's
+    network panel.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token, start = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_query_stats.reset(token)
+        return self.record(request, response, stats, start, getattr(request, 'user', None))
+
+    async def __acall__(self, request):
+        stats, token, start = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_query_stats.reset(token)
+        # request.user would hit the database synchronously here.
+        user = await request.auser() if hasattr(request, 'auser') else None
+        return self.record(request, response, stats, start, user)
+
+    def start(self):
+        # Connections opened before this module was imported missed the signal.
+        for connection in connections.all(initialized_only=True):
+            install_query_counter(None, connection)
+        stats = {'queries': 0, 'db_time': 0.0}
+        return stats, request_query_stats.set(stats), time.perf_counter()
+
+    def record(self, request, response, stats, start, user):
+        duration = time.perf_counter() - start
+        total_ms = duration * 1000
+        db_ms = stats['db_time'] * 1000
+
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        budget = get_query_budget(match.func) if match else None
+        metrics.observe_request(view_name, request.method, duration, stats['db_time'], stats['queries'])
+        query_logger.info(
+            "view=%s method=%s status=%s queries=%d db_ms=%.1f total_ms=%.1f",
+            view_name, request.method, response.status_code, stats['queries'], db_ms, total_ms,
+        )
+        if budget is not None and stats['queries'] > budget:
+            query_logger.warning(
+                "view=%s exceeded its query budget: queries=%d budget=%d",
+                view_name, stats['queries'], budget,
+            )
+
+        if user is not None and user.is_staff:
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{stats["queries"]} queries", '
+                f'total;dur={total_ms:.1f}'
+            )
+        return response
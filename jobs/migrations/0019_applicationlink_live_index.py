@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0018_delete_interviewslot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='applicationlink',
+            index=models.Index(condition=models.Q(('is_used', False)), fields=['expires_at'], name='applink_live_expires_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0019_applicationlink_live_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.PositiveBigIntegerField(unique=True)),
+                ('token', models.UUIDField()),
+                ('full_name', models.CharField(max_length=150)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone_number', models.CharField(max_length=20)),
+                ('cover_letter', models.TextField(blank=True, null=True)),
+                ('submitted_at', models.DateTimeField()),
+                ('interview_date', models.DateTimeField(blank=True, null=True)),
+                ('overall_status', models.CharField(choices=[('review', 'In Review'), ('hired', 'Hired'), ('rejected', 'Rejected')], max_length=10)),
+                ('phone_status', models.CharField(choices=[('pending', 'Pending'), ('passed', 'Passed'), ('failed', 'Failed')], max_length=10)),
+                ('phone_comment', models.TextField(blank=True, null=True)),
+                ('hr_status', models.CharField(choices=[('pending', 'Pending'), ('passed', 'Passed'), ('failed', 'Failed')], max_length=10)),
+                ('hr_comment', models.TextField(blank=True, null=True)),
+                ('technical_status', models.CharField(choices=[('pending', 'Pending'), ('passed', 'Passed'), ('failed', 'Failed')], max_length=10)),
+                ('technical_comment', models.TextField(blank=True, null=True)),
+                ('ceo_status', models.CharField(choices=[('pending', 'Pending'), ('passed', 'Passed'), ('failed', 'Failed')], max_length=10)),
+                ('ceo_comment', models.TextField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_applications', to=settings.AUTH_USER_MODEL)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_applications', to='jobs.job')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedCVSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.PositiveBigIntegerField(unique=True)),
+                ('applicant_name', models.CharField(max_length=150)),
+                ('applicant_email', models.EmailField(max_length=254)),
+                ('cv_file', models.FileField(max_length=255, upload_to='cvs/archive/')),
+                ('cv_compressed', models.BooleanField(default=False, help_text='The stored file is gzip-compressed.')),
+                ('department', models.CharField(choices=[('HR', 'Human Resources'), ('IT', 'Information Technology'), ('Finance', 'Finance'), ('Sales', 'Sales'), ('Marketing', 'Marketing'), ('Operations', 'Operations')], db_index=True, max_length=50)),
+                ('submitted_at', models.DateTimeField()),
+                ('viewed', models.BooleanField(default=False)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_submissions', to='jobs.job')),
+            ],
+        ),
+    ]
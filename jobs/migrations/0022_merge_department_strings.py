@@ -0,0 +1,61 @@
+from django.db import migrations
+from django.utils.text import slugify
+
+# Canonical departments: the union of the old Job and CVSubmission choices.
+DEPARTMENTS = [
+    ('finance', 'Finance'),
+    ('hr', 'Human Resources'),
+    ('it', 'Information Technology'),
+    ('marketing', 'Marketing'),
+    ('operations', 'Operations'),
+    ('production', 'Production'),
+    ('sales', 'Sales'),
+]
+# Spellings seen in the string columns that are not already a slug or a name.
+ALIASES = {
+    'human resources': 'hr',
+    'information technology': 'it',
+}
+
+STRING_MODELS = ['Job', 'CVSubmission', 'ArchivedCVSubmission']
+
+
+def merge_department_strings(apps, schema_editor):
+    Department = apps.get_model('jobs', 'Department')
+    by_slug = {}
+    for slug, name in DEPARTMENTS:
+        by_slug[slug], _ = Department.objects.get_or_create(slug=slug, defaults={'name': name})
+
+    for model_name in STRING_MODELS:
+        Model = apps.get_model('jobs', model_name)
+        # One UPDATE per distinct spelling rather than one per row.
+        values = Model.objects.exclude(department__isnull=True).values_list('department', flat=True).distinct()
+        for value in list(values):
+            cleaned = value.strip()
+            if not cleaned:
+                continue
+            slug = ALIASES.get(cleaned.lower(), slugify(cleaned))
+            if slug not in by_slug:
+                by_slug[slug], _ = Department.objects.get_or_create(slug=slug, defaults={'name': cleaned.title()})
+            Model.objects.filter(department=value).update(department_ref=by_slug[slug])
+
+
+def restore_department_strings(apps, schema_editor):
+    Department = apps.get_model('jobs', 'Department')
+    for department in Department.objects.all():
+        apps.get_model('jobs', 'Job').objects.filter(department_ref=department).update(department=department.slug)
+        # CVs used 'HR'/'IT' and title-cased names as keys.
+        cv_key = department.slug.upper() if department.slug in ('hr', 'it') else department.name
+        for model_name in ('CVSubmission', 'ArchivedCVSubmission'):
+            apps.get_model('jobs', model_name).objects.filter(department_ref=department).update(department=cv_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0021_department'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_department_strings, restore_department_strings),
+    ]
@@ -0,0 +1,33 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0022_merge_department_strings'),
+    ]
+
+    operations = [
+        migrations.RemoveField(model_name='job', name='department'),
+        migrations.RemoveField(model_name='cvsubmission', name='department'),
+        migrations.RemoveField(model_name='archivedcvsubmission', name='department'),
+        migrations.RenameField(model_name='job', old_name='department_ref', new_name='department'),
+        migrations.RenameField(model_name='cvsubmission', old_name='department_ref', new_name='department'),
+        migrations.RenameField(model_name='archivedcvsubmission', old_name='department_ref', new_name='department'),
+        migrations.AlterField(
+            model_name='job',
+            name='department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='jobs.department'),
+        ),
+        migrations.AlterField(
+            model_name='cvsubmission',
+            name='department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cv_submissions', to='jobs.department'),
+        ),
+        migrations.AlterField(
+            model_name='archivedcvsubmission',
+            name='department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_submissions', to='jobs.department'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:54
+
+from django.db import migrations, models
+
+
+def fill_folder_counts(apps, schema_editor):
+    CVSubmission = apps.get_model('jobs', 'CVSubmission')
+    CVFolderCount = apps.get_model('jobs', 'CVFolderCount')
+    rows = (
+        CVSubmission.objects.order_by().values_list('department_id')
+        .annotate(total=models.Count('id'), unseen=models.Count('id', filter=models.Q(viewed=False)))
+    )
+    CVFolderCount.objects.bulk_create([
+        CVFolderCount(department_id=department_id or 0, total=total, unseen=unseen)
+        for department_id, total, unseen in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0023_department_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVFolderCount',
+            fields=[
+                ('department_id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('total', models.IntegerField(default=0)),
+                ('unseen', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(fill_folder_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0024_cvfoldercount'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StageTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('phone', 'phone'), ('hr', 'hr'), ('technical', 'technical'), ('ceo', 'ceo')], max_length=10)),
+                ('from_status', models.CharField(blank=True, choices=[('pending', 'Pending'), ('passed', 'Passed'), ('failed', 'Failed')], max_length=10)),
+                ('to_status', models.CharField(choices=[('pending', 'Pending'), ('passed', 'Passed'), ('failed', 'Failed')], max_length=10)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('stage_entered_at', models.DateTimeField(blank=True, null=True)),
+                ('application', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='stage_transitions', to='jobs.detailedapplication')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stage_transitions', to=settings.AUTH_USER_MODEL)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stage_transitions', to='jobs.department')),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stage_transitions', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['application', 'id'], name='stagetrans_app_idx'), models.Index(fields=['stage', 'changed_at'], name='stagetrans_stage_idx'), models.Index(fields=['job', 'stage', 'changed_at'], name='stagetrans_job_idx'), models.Index(fields=['department', 'stage', 'changed_at'], name='stagetrans_dept_idx')],
+            },
+        ),
+    ]
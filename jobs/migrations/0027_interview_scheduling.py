@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0026_calendar_feed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Interview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('phone', 'phone'), ('hr', 'hr'), ('technical', 'technical'), ('ceo', 'ceo')], max_length=10)),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('booked_at', models.DateTimeField(auto_now_add=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interviews', to='jobs.detailedapplication')),
+                ('interviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interviews', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['start'],
+                'indexes': [models.Index(fields=['interviewer', 'end', 'start'], name='interview_range_idx')],
+                'constraints': [models.UniqueConstraint(fields=('application', 'stage'), name='interview_one_per_stage'), models.CheckConstraint(condition=models.Q(('end__gt', models.F('start'))), name='interview_end_after_start')],
+            },
+        ),
+        migrations.CreateModel(
+            name='InterviewerAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('capacity', models.PositiveSmallIntegerField(default=1)),
+                ('interviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interview_availability', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'interviewer availability',
+                'ordering': ['start'],
+                'indexes': [models.Index(fields=['interviewer', 'end', 'start'], name='availability_range_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('end__gt', models.F('start'))), name='availability_end_after_start', violation_error_message='The window must end after it starts.')],
+            },
+        ),
+    ]
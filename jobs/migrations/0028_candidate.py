@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0027_interview_scheduling'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Candidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('full_name', models.CharField(max_length=150)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedapplication',
+            name='candidate',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_applications', to='jobs.candidate'),
+        ),
+        migrations.AddField(
+            model_name='archivedcvsubmission',
+            name='candidate',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_cv_submissions', to='jobs.candidate'),
+        ),
+        migrations.AddField(
+            model_name='cvsubmission',
+            name='candidate',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cv_submissions', to='jobs.candidate'),
+        ),
+        migrations.AddField(
+            model_name='detailedapplication',
+            name='candidate',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='applications', to='jobs.candidate'),
+        ),
+    ]
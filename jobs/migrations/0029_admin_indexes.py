@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:21
+
+from django.db import migrations, models
+
+
+# Matches the SQL PostgreSQL gets for full_name__istartswith, which the admin
+# search uses; a plain index cannot serve UPPER(...) LIKE 'X%'.
+def create_name_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS candidate_name_prefix_idx '
+            'ON jobs_candidate (UPPER("full_name"::text) text_pattern_ops)'
+        )
+
+
+def drop_name_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS candidate_name_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0028_candidate'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cvsubmission',
+            index=models.Index(fields=['submitted_at'], name='cv_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='detailedapplication',
+            index=models.Index(fields=['submitted_at'], name='application_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='detailedapplication',
+            index=models.Index(fields=['overall_status', 'submitted_at'], name='application_status_idx'),
+        ),
+        migrations.RunPython(create_name_prefix_index, drop_name_prefix_index),
+    ]
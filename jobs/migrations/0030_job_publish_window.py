@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:24
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def publish_existing_jobs_at_creation(apps, schema_editor):
+    # Keeps the listing order of the jobs posted so far.
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.update(publish_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0029_admin_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='close_at',
+            field=models.DateTimeField(blank=True, help_text='When the job stops accepting applications. Leave empty to keep it open.', null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='publish_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When the job becomes visible to applicants.'),
+        ),
+        migrations.RunPython(publish_existing_jobs_at_creation, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-publish_at'], name='job_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('close_at__isnull', False), ('is_active', True)), fields=['close_at'], name='job_closing_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.CheckConstraint(condition=models.Q(('close_at__isnull', True), ('close_at__gt', models.F('publish_at')), _connector='OR'), name='job_close_after_publish', violation_error_message='The closing date must be after the publishing date.'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0030_job_publish_window'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cvfoldercount',
+            name='department_id',
+            field=models.PositiveBigIntegerField(primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:02
+
+from django.db import migrations
+
+
+def flag_links_with_applications(apps, schema_editor):
+    # Links used to be flagged only after the confirmation emails were sent,
+    # so an SMTP failure left an application behind an "unused" link.
+    ApplicationLink = apps.get_model('jobs', 'ApplicationLink')
+    ApplicationLink.objects.filter(is_used=False, application_details__isnull=False).update(is_used=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0031_cvfoldercount_bigint'),
+    ]
+
+    operations = [
+        migrations.RunPython(flag_links_with_applications, migrations.RunPython.noop),
+    ]
@@ -1,30 +1,97 @@
 import uuid
-from django.db import models
+from collections import Counter
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
+class Department(models.Model):
+    """
+    A hiring department, shared by jobs and CV submissions so both group and
+    filter on the same integer key.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(max_length=50, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+class Candidate(models.Model):
+    """
+    One person across all their CVs and applications, keyed by normalized
+    email. Submissions link to it when they are saved; the
+    backfill_candidates command links older rows.
+    """
+    email = models.EmailField(unique=True)
+    full_name = models.CharField(max_length=150)  # as given on the latest submission
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @staticmethod
+    def normalize_email(email):
+        return email.strip().lower()
+
+    @classmethod
+    def for_email(cls, email, full_name):
+        """
+        The candidate with this email, created on first sight, in one upsert
+        that also takes the latest name.
+        """
+        candidate = cls(email=cls.normalize_email(email), full_name=full_name)
+        cls.objects.bulk_create(
+            [candidate], update_conflicts=True, unique_fields=['email'], update_fields=['full_name'])
+        return candidate
+
+    def __str__(self):
+        return f"{self.full_name} <{self.email}>"
+
 class Job(models.Model):
     """
     Represents a job posting in the system.
     """
-    DEPARTMENT_CHOICES = [
-        ('marketing', 'Marketing'),
-        ('hr', 'Human Resources'),
-        ('it', 'Information Technology'),
-        ('finance', 'Finance'),
-        ('sales', 'Sales'),
-        ('production', 'Production'),
-    ]
     title = models.CharField(max_length=200)
-    department = models.CharField(max_length=50, choices=DEPARTMENT_CHOICES, blank=True, null=True)
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
     description = models.TextField()
     requirements = models.TextField()
     location = models.CharField(max_length=100)
     is_active = models.BooleanField(default=True, help_text="Designates whether the job is currently active and visible to applicants.")
+    publish_at = models.DateTimeField(default=timezone.now, help_text="When the job becomes visible to applicants.")
+    close_at = models.DateTimeField(null=True, blank=True, help_text="When the job stops accepting applications. Leave empty to keep it open.")
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posted_jobs')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # The public listing: open jobs, newest first.
+            models.Index(fields=['-publish_at'], condition=models.Q(is_active=True), name='job_open_idx'),
+            # What close_expired_jobs looks for.
+            models.Index(fields=['close_at'], condition=models.Q(is_active=True, close_at__isnull=False), name='job_closing_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(close_at__isnull=True) | models.Q(close_at__gt=models.F('publish_at')),
+                name='job_close_after_publish',
+                violation_error_message="The closing date must be after the publishing date.",
+            ),
+        ]
+
+    @classmethod
+    def open(cls, at=None):
+        """Jobs applicants can see and apply to at ``at`` (default: now)."""
+        at = at or timezone.now()
+        # close_expired_jobs clears is_active once close_at passes, so the
+        # close_at test only filters the few jobs it has not reached yet.
+        return cls.objects.filter(is_active=True, publish_at__lte=at).filter(
+            models.Q(close_at__isnull=True) | models.Q(close_at__gt=at))
+
+    def is_open(self, at=None):
+        at = at or timezone.now()
+        return self.is_active and self.publish_at <= at and (self.close_at is None or self.close_at > at)
+
     def __str__(self):
         return self.title
 
@@ -32,41 +99,148 @@ class CVSubmission(models.Model):
     """
     Represents a CV submitted by an applicant for a specific job.
     """
-    DEPARTMENT_CHOICES = [
-        ('HR', 'Human Resources'),
-        ('IT', 'Information Technology'),
-        ('Finance', 'Finance'),
-        ('Sales', 'Sales'),
-        ('Marketing', 'Marketing'),
-        ('Operations', 'Operations'),
-    ]
     job = models.ForeignKey(Job, on_delete=models.SET_NULL, related_name='submissions',
     null=True, blank=True)
     applicant_name = models.CharField(max_length=150)
     applicant_email = models.EmailField()
     cv_file = models.FileField(upload_to='cvs/')
-    department = models.CharField(max_length=50, choices=DEPARTMENT_CHOICES, default='HR')
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, related_name='cv_submissions')
+    candidate = models.ForeignKey(Candidate, on_delete=models.SET_NULL, null=True, blank=True, related_name='cv_submissions')
     submitted_at = models.DateTimeField(auto_now_add=True)
     viewed = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['submitted_at'], name='cv_submitted_idx'),
+        ]
+
     def save(self, *args, **kwargs):
-        # 1. Clean the department name before saving
-        if self.department:
-            # strip() removes spaces at the end
-            # title() makes it "Marketing", "Sales", "It" (You might prefer .upper() for "IT")
-            
-            clean_dept = self.department.strip()
-            
-            # Special case for IT to be uppercase
-            if clean_dept.lower() == 'it':
-                self.department = 'IT'
-            elif clean_dept.lower() == 'hr':
-                self.department = 'HR'
-            else:
-                self.department = clean_dept.title() # Marketing, Sales, etc.
-                
-        super().save(*args, **kwargs)
+        # Keep the CV folder counters in step, in the same transaction.
+        with transaction.atomic(savepoint=False):
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    CVSubmission.objects.select_for_update().filter(pk=self.pk)
+                    .values_list('department_id', 'viewed').first()
+                )
+            super().save(*args, **kwargs)
+            if previous != (self.department_id, self.viewed):
+                if previous:
+                    CVFolderCount.adjust(previous[0], total=-1, unseen=-int(not previous[1]))
+                CVFolderCount.adjust(self.department_id, total=1, unseen=int(not self.viewed))
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            # Count what is stored, not what this (possibly stale) instance says.
+            current = (
+                CVSubmission.objects.select_for_update().filter(pk=self.pk)
+                .values_list('department_id', 'viewed').first()
+            )
+            result = super().delete(*args, **kwargs)
+            if current:
+                CVFolderCount.adjust(current[0], total=-1, unseen=-int(not current[1]))
+        return result
+
+    @classmethod
+    def mark_viewed(cls, queryset):
+        """
+        Marks the unseen CVs in ``queryset`` as viewed and takes them off the
+        folder counters. The rows are locked first, so concurrent callers
+        never decrement the same CV twice.
+        """
+        with transaction.atomic(savepoint=False):
+            unseen = list(queryset.filter(viewed=False).select_for_update(of=('self',)).values_list('pk', 'department_id'))
+            if not unseen:
+                return 0
+            cls.objects.filter(pk__in=[pk for pk, _ in unseen]).update(viewed=True)
+            per_department = Counter(department_id for _, department_id in unseen)
+            for department_id, count in per_department.items():
+                CVFolderCount.adjust(department_id, unseen=-count)
+        return len(unseen)
+
+    @classmethod
+    def delete_with_counters(cls, queryset):
+        """Deletes the CVs in ``queryset`` in bulk and takes them off the folder counters."""
+        with transaction.atomic(savepoint=False):
+            doomed = list(queryset.select_for_update(of=('self',)).values_list('pk', 'department_id', 'viewed'))
+            cls.objects.filter(pk__in=[pk for pk, _, _ in doomed]).delete()
+            per_department = Counter()
+            unseen = Counter()
+            for _, department_id, viewed in doomed:
+                per_department[department_id] += 1
+                unseen[department_id] += not viewed
+            for department_id, count in per_department.items():
+                CVFolderCount.adjust(department_id, total=-count, unseen=-unseen[department_id])
+        return len(doomed)
+
     def __str__(self):
-        return f"CV for {self.job.title} from {self.applicant_name}"
+        job_title = self.job.title if self.job_id else "General Application"
+        return f"CV for {job_title} from {self.applicant_name}"
+
+class CVFolderCount(models.Model):
+    """
+    Per-department CV counters behind the CV database folders page, so it
+    renders from one tiny table instead of a GROUP BY over every CV. Kept in
+    step by CVSubmission.save()/delete()/mark_viewed() and by deleting a
+    Department; bulk writes call adjust() themselves, and
+    reconcile_cv_folders rebuilds the table.
+    """
+    UNASSIGNED = 0  # department_id of the folder for CVs without a department
+
+    department_id = models.PositiveBigIntegerField(primary_key=True)
+    total = models.IntegerField(default=0)
+    unseen = models.IntegerField(default=0)
+
+    @classmethod
+    def adjust(cls, department_id, total=0, unseen=0):
+        """Atomically adds ``total``/``unseen`` to a folder, creating it on first use."""
+        key = department_id or cls.UNASSIGNED
+        changes = {'total': models.F('total') + total, 'unseen': models.F('unseen') + unseen}
+        if not cls.objects.filter(pk=key).update(**changes):
+            cls.objects.get_or_create(pk=key)
+            cls.objects.filter(pk=key).update(**changes)
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recomputes every folder from CVSubmission and returns the
+        ``{department_id: (total, unseen)}`` corrections that were applied.
+        """
+        with transaction.atomic():
+            # Lock the counters first: writers queue behind us, so the recount
+            # and their increments cannot interleave.
+            stored = {
+                row.pk: (row.total, row.unseen) for row in cls.objects.select_for_update()
+            }
+            actual = {
+                (department_id or cls.UNASSIGNED): (total, unseen)
+                for department_id, total, unseen in CVSubmission.objects.order_by()
+                .values_list('department_id')
+                .annotate(total=models.Count('id'), unseen=models.Count('id', filter=models.Q(viewed=False)))
+            }
+            corrections = {}
+            for key in stored.keys() | actual.keys():
+                counts = actual.get(key, (0, 0))
+                if stored.get(key) != counts:
+                    corrections[key] = counts
+                    cls.objects.update_or_create(pk=key, defaults={'total': counts[0], 'unseen': counts[1]})
+        return corrections
+
+    @classmethod
+    def fold_into_unassigned(cls, department_id):
+        """Moves a department's counts to the unassigned folder (its CVs lose their department)."""
+        with transaction.atomic(savepoint=False):
+            row = cls.objects.select_for_update().filter(pk=department_id).first()
+            if row:
+                row.delete()
+                cls.adjust(None, total=row.total, unseen=row.unseen)
+
+@receiver(pre_delete, sender=Department)
+def fold_deleted_department_folder(sender, instance, **kwargs):
+    # Deleting a department sets CVSubmission.department to NULL with one
+    # bulk UPDATE, which CVSubmission.save() never sees. pre_delete also runs
+    # for queryset and admin bulk deletes, inside the same transaction.
+    CVFolderCount.fold_into_unassigned(instance.pk)
 
 class ApplicationLink(models.Model):
     """
@@ -80,6 +254,16 @@ class ApplicationLink(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='generated_links')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Only live (unused) links: consumed links drop out, so the index
+            # stays small while the table grows. Used by purge_expired_links.
+            models.Index(
+                fields=['expires_at'], condition=models.Q(is_used=False),
+                name='applink_live_expires_idx',
+            ),
+        ]
+
     def is_expired(self):
         return timezone.now() > self.expires_at
 
@@ -114,12 +298,25 @@ class DetailedApplication(models.Model):
     link = models.OneToOneField(ApplicationLink, on_delete=models.CASCADE, related_name='application_details')
     full_name = models.CharField(max_length=150)
     email = models.EmailField()
+    candidate = models.ForeignKey(Candidate, on_delete=models.SET_NULL, null=True, blank=True, related_name='applications')
     phone_number = models.CharField(max_length=20)
     cover_letter = models.TextField(blank=True, null=True)
     submitted_at = models.DateTimeField(auto_now_add=True)
     viewed = models.BooleanField(default=False)
     interview_date = models.DateTimeField(null=True, blank=True, help_text="Date and time of the next interview")
 
+    class Meta:
+        indexes = [
+            # Scheduled interviews only: serves the calendar feed's date range.
+            models.Index(
+                fields=['interview_date'], condition=models.Q(interview_date__isnull=False),
+                name='application_interview_idx',
+            ),
+            # Newest-first lists, unfiltered and by overall status (admin).
+            models.Index(fields=['submitted_at'], name='application_submitted_idx'),
+            models.Index(fields=['overall_status', 'submitted_at'], name='application_status_idx'),
+        ]
+
     # --- New Status Fields ---
     overall_status = models.CharField(
         max_length=10, 
@@ -178,6 +375,280 @@ class DetailedApplication(models.Model):
             
         return 5 # Completed
 
+    # Interview stages in order; current_stage is the 1-based index into this.
+    STAGES = ['phone', 'hr', 'technical', 'ceo']
+    STAGE_NAMES = {
+        'phone': 'Phone Interview',
+        'hr': 'HR Interview',
+        'technical': 'Technical Interview',
+        'ceo': 'CEO Interview',
+    }
+
+    @property
+    def waiting_stage(self):
+        """Key of the stage the application is waiting at, or None once it is closed."""
+        stage = self.current_stage
+        return self.STAGES[stage - 1] if stage <= len(self.STAGES) else None
+
+    @classmethod
+    def at_stage(cls, stage):
+        """
+        Q() matching the applications whose current_stage is ``stage``: still in
+        review, every earlier stage passed and this one pending.
+        """
+        q = models.Q(overall_status=cls.OVERALL_STATUS_REVIEW, **{f'{stage}_status': cls.STATUS_PENDING})
+        for earlier in cls.STAGES[:cls.STAGES.index(stage)]:
+            q &= models.Q(**{f'{earlier}_status': cls.STATUS_PASSED})
+        return q
+
+    def decide_overall_status(self):
+        """Hired once the CEO stage is passed, rejected once any stage failed, else in review."""
+        if self.ceo_status == self.STATUS_PASSED:
+            return self.OVERALL_STATUS_HIRED
+        if any(getattr(self, f'{stage}_status') == self.STATUS_FAILED for stage in self.STAGES):
+            return self.OVERALL_STATUS_REJECTED
+        return self.OVERALL_STATUS_REVIEW
+
+    @classmethod
+    def overall_status_expression(cls, **new_statuses):
+        """
+        SQL version of decide_overall_status(),
+        for use in UPDATE ... SET. ``new_statuses`` (e.g. ``hr='failed'``) are
+        the values being written in the same statement; other stages are read
+        from their columns.
+        """
+        def status(stage):
+            return models.Value(new_statuses[stage]) if stage in new_statuses else models.F(f'{stage}_status')
+
+        any_failed = models.Q()
+        for stage in cls.STAGES:
+            any_failed |= models.Q(models.lookups.Exact(status(stage), cls.STATUS_FAILED))
+        return models.Case(
+            models.When(models.lookups.Exact(status('ceo'), cls.STATUS_PASSED), then=models.Value(cls.OVERALL_STATUS_HIRED)),
+            models.When(any_failed, then=models.Value(cls.OVERALL_STATUS_REJECTED)),
+            default=models.Value(cls.OVERALL_STATUS_REVIEW),
+            output_field=models.CharField(),
+        )
+
     def __str__(self):
         return f"Detailed application from {self.full_name}"
 
+
+class StageTransition(models.Model):
+    """
+    Append-only history of interview stage changes, one row per stage whose
+    status changed, written in the same transaction as the change. The job,
+    department and the time the application reached the stage are copied in,
+    so time-in-stage, throughput and backlog queries read only this narrow
+    table. Rows outlive their application (archiving keeps its id as
+    ArchivedApplication.original_id).
+    """
+    ENTERED = ''  # from_status of the row logged when an application is submitted
+
+    application = models.ForeignKey(
+        DetailedApplication, on_delete=models.DO_NOTHING, db_constraint=False, related_name='stage_transitions')
+    job = models.ForeignKey(Job, on_delete=models.SET_NULL, null=True, blank=True, related_name='stage_transitions')
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, related_name='stage_transitions')
+    stage = models.CharField(max_length=10, choices=[(stage, stage) for stage in DetailedApplication.STAGES])
+    from_status = models.CharField(max_length=10, blank=True, choices=DetailedApplication.STATUS_CHOICES)
+    to_status = models.CharField(max_length=10, choices=DetailedApplication.STATUS_CHOICES)
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='stage_transitions')
+    changed_at = models.DateTimeField(default=timezone.now)
+    # When the application reached this stage (submission for the phone stage,
+    # otherwise the previous stage's pass). Null if that predates the history.
+    stage_entered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['application', 'id'], name='stagetrans_app_idx'),
+            models.Index(fields=['stage', 'changed_at'], name='stagetrans_stage_idx'),
+            models.Index(fields=['job', 'stage', 'changed_at'], name='stagetrans_job_idx'),
+            models.Index(fields=['department', 'stage', 'changed_at'], name='stagetrans_dept_idx'),
+        ]
+
+    @classmethod
+    def log(cls, changes, changed_by=None):
+        """
+        Appends a transition for each ``(application, stage, from_status,
+        to_status)`` in ``changes``. Call it inside the transaction that makes
+        the change; applications need ``link__job`` selected.
+        """
+        stages = DetailedApplication.STAGES
+        previous = {stage: stages[stages.index(stage) - 1] for stage in stages[1:]}
+        wanted = [(application.pk, previous[stage]) for application, stage, _, _ in changes if stage in previous]
+        passed_at = {}
+        if wanted:
+            passed_at = {
+                (row['application_id'], row['stage']): row['at']
+                for row in cls.objects.order_by()
+                .filter(application_id__in={pk for pk, _ in wanted}, stage__in={stage for _, stage in wanted},
+                        to_status=DetailedApplication.STATUS_PASSED)
+                .values('application_id', 'stage').annotate(at=models.Max('changed_at'))
+            }
+
+        now = timezone.now()
+        return cls.objects.bulk_create([
+            cls(
+                application_id=application.pk,
+                job_id=application.link.job_id,
+                department_id=application.link.job.department_id if application.link.job else None,
+                stage=stage, from_status=from_status, to_status=to_status,
+                changed_by=changed_by, changed_at=now,
+                stage_entered_at=(application.submitted_at if stage not in previous
+                                  else passed_at.get((application.pk, previous[stage]))),
+            )
+            for application, stage, from_status, to_status in changes
+        ])
+
+    @classmethod
+    def latest(cls):
+        """
+        The most recent transition of every application: where each one stands
+        now. Includes applications deleted since, whose history remains.
+        """
+        newer = cls.objects.filter(application_id=models.OuterRef('application_id'), pk__gt=models.OuterRef('pk'))
+        return cls.objects.filter(~models.Exists(newer))
+
+    @classmethod
+    def waiting_stage(cls):
+        """
+        Expression for the stage an application waits at after a transition:
+        the stage itself if pending, the next one if passed, None once failed
+        or hired.
+        """
+        stages = DetailedApplication.STAGES
+        return models.Case(
+            models.When(to_status=DetailedApplication.STATUS_PENDING, then=models.F('stage')),
+            *[
+                models.When(to_status=DetailedApplication.STATUS_PASSED, stage=stage, then=models.Value(following))
+                for stage, following in zip(stages, stages[1:])
+            ],
+            default=models.Value(None),
+            output_field=models.CharField(),
+        )
+
+    def __str__(self):
+        return f"Application {self.application_id}: {self.stage} {self.from_status or 'entered'} -> {self.to_status}"
+
+class CalendarFeed(models.Model):
+    """
+    Secret token of an HR user's read-only interview calendar (ICS) feed.
+    Regenerating the token revokes the subscription URLs shared so far.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='calendar_feed')
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Calendar feed of {self.user}"
+
+class InterviewerAvailability(models.Model):
+    """
+    A window in which an HR user takes interviews. ``capacity`` is how many
+    interviews may run at the same time in it (a panel, several rooms).
+    """
+    interviewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='interview_availability')
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    capacity = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        ordering = ['start']
+        verbose_name_plural = 'interviewer availability'
+        indexes = [
+            # Overlap lookups filter on end > X first, so past windows are skipped.
+            models.Index(fields=['interviewer', 'end', 'start'], name='availability_range_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end__gt=models.F('start')), name='availability_end_after_start',
+                violation_error_message="The window must end after it starts.",
+            ),
+        ]
+
+    @classmethod
+    def overlapping(cls, interviewer_ids, start, end):
+        return cls.objects.filter(interviewer_id__in=interviewer_ids, end__gt=start, start__lt=end)
+
+    def __str__(self):
+        return f"{self.interviewer} available {self.start:%Y-%m-%d %H:%M} - {self.end:%H:%M}"
+
+class Interview(models.Model):
+    """
+    A booked interview: one per application and stage, with an interviewer
+    and a time range. The application's interview_date mirrors the start of
+    the booking for the stage it is waiting at.
+    """
+    application = models.ForeignKey(DetailedApplication, on_delete=models.CASCADE, related_name='interviews')
+    stage = models.CharField(max_length=10, choices=[(stage, stage) for stage in DetailedApplication.STAGES])
+    interviewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='interviews')
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    booked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['start']
+        indexes = [
+            models.Index(fields=['interviewer', 'end', 'start'], name='interview_range_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['application', 'stage'], name='interview_one_per_stage'),
+            models.CheckConstraint(condition=models.Q(end__gt=models.F('start')), name='interview_end_after_start'),
+        ]
+
+    @classmethod
+    def overlapping(cls, interviewer_ids, start, end):
+        return cls.objects.filter(interviewer_id__in=interviewer_ids, end__gt=start, start__lt=end)
+
+    def __str__(self):
+        return f"{self.stage} interview of application {self.application_id} at {self.start:%Y-%m-%d %H:%M}"
+
+class ArchivedCVSubmission(models.Model):
+    """
+    Cold copy of a CVSubmission older than the retention window, moved out of
+    the hot table by the archive_old_records command.
+    """
+    original_id = models.PositiveBigIntegerField(unique=True)  # makes re-runs idempotent
+    job = models.ForeignKey(Job, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_submissions')
+    applicant_name = models.CharField(max_length=150)
+    applicant_email = models.EmailField()
+    cv_file = models.FileField(upload_to='cvs/archive/', max_length=255)
+    cv_compressed = models.BooleanField(default=False, help_text="The stored file is gzip-compressed.")
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_submissions')
+    candidate = models.ForeignKey(Candidate, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_cv_submissions')
+    submitted_at = models.DateTimeField()
+    viewed = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived CV from {self.applicant_name}"
+
+class ArchivedApplication(models.Model):
+    """
+    Cold copy of a DetailedApplication that reached a final overall status
+    (hired/rejected), together with the details of its used link.
+    """
+    original_id = models.PositiveBigIntegerField(unique=True)  # makes re-runs idempotent
+    job = models.ForeignKey(Job, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_applications')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_applications')
+    token = models.UUIDField()
+    full_name = models.CharField(max_length=150)
+    email = models.EmailField()
+    candidate = models.ForeignKey(Candidate, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_applications')
+    phone_number = models.CharField(max_length=20)
+    cover_letter = models.TextField(blank=True, null=True)
+    submitted_at = models.DateTimeField()
+    interview_date = models.DateTimeField(null=True, blank=True)
+    overall_status = models.CharField(max_length=10, choices=DetailedApplication.OVERALL_STATUS_CHOICES)
+    phone_status = models.CharField(max_length=10, choices=DetailedApplication.STATUS_CHOICES)
+    phone_comment = models.TextField(blank=True, null=True)
+    hr_status = models.CharField(max_length=10, choices=DetailedApplication.STATUS_CHOICES)
+    hr_comment = models.TextField(blank=True, null=True)
+    technical_status = models.CharField(max_length=10, choices=DetailedApplication.STATUS_CHOICES)
+    technical_comment = models.TextField(blank=True, null=True)
+    ceo_status = models.CharField(max_length=10, choices=DetailedApplication.STATUS_CHOICES)
+    ceo_comment = models.TextField(blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived application from {self.full_name}"
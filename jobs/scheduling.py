@@ -0,0 +1,164 @@
+"""
+Interview scheduling on top of the interviewers' availability windows.
+
+Slots are INTERVIEW_SLOT_MINUTES long and start at whole slot steps from
+the start of their window. A slot has room while fewer bookings than the
+window's capacity overlap it. free_slots() and plan() read the windows and
+bookings of a time range in two queries and work out the rest in memory,
+however many candidates and slots there are. book() checks again with the
+windows locked, so two HR users booking the same interviewer at the same
+time cannot both take the last seat.
+"""
+
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DetailedApplication, Interview, InterviewerAvailability
+
+PLAN_HORIZON = timedelta(days=30)
+
+
+class SchedulingConflict(Exception):
+    """A booking falls outside the interviewer's availability or its slot is full."""
+
+
+def slot_length():
+    return timedelta(minutes=settings.INTERVIEW_SLOT_MINUTES)
+
+
+class BookedRanges:
+    """Bookings of some interviewers, sorted by start, for counting overlaps in memory."""
+
+    def __init__(self, bookings=()):
+        self.ranges = defaultdict(list)
+        self.longest = timedelta(0)
+        for interviewer_id, start, end in bookings:
+            self.add(interviewer_id, start, end)
+
+    def add(self, interviewer_id, start, end):
+        insort(self.ranges[interviewer_id], (start, end))
+        self.longest = max(self.longest, end - start)
+
+    def count(self, interviewer_id, start, end):
+        """How many bookings of the interviewer overlap [start, end)."""
+        ranges = self.ranges[interviewer_id]
+        count = 0
+        # Walk back from the last booking that starts before ``end``; nothing
+        # starting longer ago than the longest booking can still overlap.
+        for i in range(bisect_left(ranges, (end,)) - 1, -1, -1):
+            booked_start, booked_end = ranges[i]
+            if booked_start + self.longest <= start:
+                break
+            if booked_end > start:
+                count += 1
+        return count
+
+
+def free_slots(interviewer_ids, not_before, until, length=None):
+    """
+    ``(start, interviewer_id, free seats)`` for every slot with room that
+    starts between ``not_before`` and ``until``, in time order.
+    """
+    length = length or slot_length()
+    windows = (
+        InterviewerAvailability.overlapping(interviewer_ids, not_before, until)
+        .values_list('interviewer_id', 'start', 'end', 'capacity')
+    )
+    booked = BookedRanges(
+        Interview.overlapping(interviewer_ids, not_before, until + length)
+        .values_list('interviewer_id', 'start', 'end')
+    )
+
+    slots = []
+    for interviewer_id, start, end, capacity in windows:
+        if start < not_before:
+            # First slot step of the window at or after not_before.
+            start += -((start - not_before) // length) * length
+        while start < until and start + length <= end:
+            free = capacity - booked.count(interviewer_id, start, start + length)
+            if free > 0:
+                slots.append((start, interviewer_id, free))
+            start += length
+    slots.sort()
+    return slots
+
+
+def plan(applications, interviewer_ids, not_before, length=None, horizon=PLAN_HORIZON):
+    """
+    Gives each application, in order, the earliest slot still free. Returns
+    ``(proposals, unplaced)``: ``(application, interviewer_id, start, end)``
+    tuples, and the applications no slot was left for within the horizon.
+    """
+    length = length or slot_length()
+    applications = list(applications)
+    proposals = []
+    if applications and interviewer_ids:
+        for start, interviewer_id, free in free_slots(interviewer_ids, not_before, not_before + horizon, length):
+            for application in applications[len(proposals):len(proposals) + free]:
+                proposals.append((application, interviewer_id, start, start + length))
+            if len(proposals) == len(applications):
+                break
+    return proposals, applications[len(proposals):]
+
+
+def book(bookings, stage):
+    """
+    Books ``(application, interviewer_id, start, end)`` interviews for
+    ``stage``. Each one replaces the application's booking for that stage
+    and sets its interview_date. All or nothing: raises SchedulingConflict,
+    listing every booking that does not fit, before writing anything.
+    """
+    if not bookings:
+        return []
+    interviewer_ids = {interviewer_id for _, interviewer_id, _, _ in bookings}
+    application_ids = [application.pk for application, _, _, _ in bookings]
+    first = min(start for _, _, start, _ in bookings)
+    last = max(end for _, _, _, end in bookings)
+
+    with transaction.atomic():
+        # Locking the windows queues other bookings of these interviewers behind us.
+        windows = list(
+            InterviewerAvailability.overlapping(interviewer_ids, first, last)
+            .select_for_update().values_list('interviewer_id', 'start', 'end', 'capacity')
+        )
+        booked = BookedRanges(
+            Interview.overlapping(interviewer_ids, first, last)
+            .exclude(application_id__in=application_ids, stage=stage)
+            .values_list('interviewer_id', 'start', 'end')
+        )
+
+        problems = []
+        for application, interviewer_id, start, end in bookings:
+            when = timezone.localtime(start).strftime('%a %d %b %H:%M')
+            capacity = next((
+                capacity for window_interviewer, window_start, window_end, capacity in windows
+                if window_interviewer == interviewer_id and window_start <= start and end <= window_end
+            ), None)
+            if capacity is None:
+                problems.append(f"{application.full_name}: {when} is outside the interviewer's availability")
+            elif booked.count(interviewer_id, start, end) >= capacity:
+                problems.append(f"{application.full_name}: the {when} slot is already full")
+            else:
+                booked.add(interviewer_id, start, end)
+        if problems:
+            raise SchedulingConflict('; '.join(problems))
+
+        Interview.objects.filter(application_id__in=application_ids, stage=stage).delete()
+        interviews = Interview.objects.bulk_create([
+            Interview(application=application, stage=stage, interviewer_id=interviewer_id, start=start, end=end)
+            for application, interviewer_id, start, end in bookings
+        ])
+        for application, _, start, _ in bookings:
+            application.interview_date = start
+        DetailedApplication.objects.bulk_update([application for application, _, _, _ in bookings], ['interview_date'])
+    return interviews
+
+
+def cancel(application_ids):
+    """Drops the upcoming interviews of applications (rejected, or their date cleared)."""
+    return Interview.objects.filter(application_id__in=application_ids, end__gt=timezone.now()).delete()
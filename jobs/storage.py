@@ -0,0 +1,16 @@
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class PortalStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Hashed + gzip/brotli precompressed static files.
+    Assets that are not part of the build (the logos are uploaded straight to
+    STATIC_ROOT on the server) keep their plain URL instead of raising.
+    """
+    manifest_strict = False
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            return name
@@ -1,3 +1,680 @@
-from django.test import TestCase
+import itertools
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, resolve, reverse
+from django.utils import timezone
+
+from . import scheduling, urls as job_urls
+from .admin import LargeTablePaginator
+from .context_processors import NOTIFICATIONS_SHOWN, notifications
+from .db import get_query_budget
+from .models import (
+    ApplicationLink, ArchivedApplication, ArchivedCVSubmission, CalendarFeed, Candidate, CVFolderCount, CVSubmission, DetailedApplication, Department, Interview, InterviewerAvailability, Job,
+    StageTransition,
+)
+from .views import save_detailed_application
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every view in jobs/urls.py declares a query budget (@query_budget or a
+    ``query_budget`` class attribute). Requests run against several rows per
+    table, so an N+1 pushes the view over its budget and fails CI.
+    """
+    ROWS = 8
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hr = User.objects.create_user('hr', password='x', is_staff=True)
+        cls.sales = Department.objects.get(slug='sales')
+        cls.job = Job.objects.create(
+            title='Backend Developer', department=Department.objects.get(slug='it'), description='Django',
+            requirements='Python', location='Cairo', created_by=cls.hr,
+        )
+        for i in range(cls.ROWS):
+            job = Job.objects.create(
+                title=f'Job {i}', department=cls.sales, description='d',
+                requirements='r', location='Giza', created_by=cls.hr,
+            )
+            CVSubmission.objects.create(
+                job=cls.job, applicant_name=f'Applicant {i}',
+                applicant_email=f'a{i}@example.com', cv_file='cvs/cv.pdf',
+            )
+            CVSubmission.objects.create(
+                job=None, applicant_name=f'General {i}', department=cls.sales,
+                applicant_email=f'g{i}@example.com', cv_file='cvs/cv.pdf',
+            )
+            for link_job in (job, None):
+                link = ApplicationLink.objects.create(
+                    job=link_job, created_by=cls.hr,
+                    expires_at=timezone.now() + timedelta(days=7),
+                )
+                DetailedApplication.objects.create(
+                    link=link, full_name=f'Candidate {i}',
+                    email=f'c{i}@example.com', phone_number='0100',
+                )
+        cls.cv = CVSubmission.objects.first()
+        cls.application = DetailedApplication.objects.first()
+        cls.feed = CalendarFeed.objects.create(user=cls.hr)
+        call_command('backfill_candidates', stdout=StringIO())
+        cls.candidate = Candidate.objects.get(email='a0@example.com')
+        cls.open_link = ApplicationLink.objects.create(
+            job=cls.job, created_by=cls.hr,
+            expires_at=timezone.now() + timedelta(days=7),
+        )
+
+    def url_kwargs(self):
+        return {
+            'job-detail': {'pk': self.job.pk},
+            'application-form': {'token': self.open_link.token},
+            'submit-cv': {'pk': self.job.pk},
+            'submit-application': {'token': self.open_link.token},
+            'job-update': {'pk': self.job.pk},
+            'job-delete': {'pk': self.job.pk},
+            'job-toggle-status': {'pk': self.job.pk},
+            'view-cv-submissions': {'job_pk': self.job.pk},
+            'update-application-status': {'pk': self.application.pk},
+            'generate-link-from-cv': {'cv_id': self.cv.pk},
+            'view-department-cvs': {'department_id': self.sales.pk},
+            'download-archived-cv': {'pk': 1},
+            'interview-calendar-feed': {'token': self.feed.token},
+            'candidate-timeline': {'pk': self.candidate.pk},
+        }
+
+    def url_names(self):
+        return [
+            pattern.name for pattern in job_urls.urlpatterns
+            if isinstance(pattern, URLPattern)
+        ]
+
+    def test_every_view_declares_a_budget(self):
+        kwargs = self.url_kwargs()
+        for name in self.url_names():
+            with self.subTest(view=name):
+                match = resolve(reverse(name, kwargs=kwargs.get(name)))
+                self.assertIsNotNone(get_query_budget(match.func))
+
+    def test_views_stay_within_budget(self):
+        self.client.force_login(self.hr)
+        kwargs = self.url_kwargs()
+        for name in self.url_names():
+            url = reverse(name, kwargs=kwargs.get(name))
+            budget = get_query_budget(resolve(url).func)
+            with self.subTest(view=name), self.assertLogs('jobs.queries', 'INFO'):
+                with CaptureQueriesContext(connections['default']) as queries:
+                    self.client.get(url)
+                self.assertLessEqual(
+                    len(queries), budget,
+                    f"{name} ran {len(queries)} queries (budget {budget}):\n"
+                    + "\n".join(q['sql'] for q in queries.captured_queries),
+                )
+
+    def test_server_timing_header_for_staff_only(self):
+        response = self.client.get(reverse('job-list'))
+        self.assertNotIn('Server-Timing', response)
+
+        self.client.force_login(self.hr)
+        response = self.client.get(reverse('job-list'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+
+@override_settings(THROTTLE_RATES={'job-search': '2/m'})
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_search_is_throttled_per_client(self):
+        url = reverse('ajax-search-jobs')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(response.json()['retry_after'], 30)
+
+        # Another address has its own bucket.
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    @override_settings(TRUSTED_PROXY_HOPS=1)
+    def test_clients_behind_the_proxy_get_their_own_bucket(self):
+        url = reverse('ajax-search-jobs')
+        for _ in range(2):
+            self.client.get(url, HTTP_X_FORWARDED_FOR='1.1.1.1')
+        self.assertEqual(self.client.get(url, HTTP_X_FORWARDED_FOR='1.1.1.1').status_code, 429)
+        # Only the last hop is trusted: a spoofed first entry does not help.
+        self.assertEqual(self.client.get(url, HTTP_X_FORWARDED_FOR='9.9.9.9, 1.1.1.1').status_code, 429)
+        self.assertEqual(self.client.get(url, HTTP_X_FORWARDED_FOR='2.2.2.2').status_code, 200)
+
+    @override_settings(THROTTLE_RATES={'cv-upload': '1/h'})
+    def test_rejected_uploads_do_not_spend_a_token(self):
+        url = reverse('submit-general-cv')
+        for _ in range(3):
+            self.assertEqual(self.client.post(url, {'applicant_name': 'Mona'}).status_code, 200)
+
+
+class CVFolderCountTests(TestCase):
+    def test_deleting_a_department_moves_its_folder_to_unassigned(self):
+        sales = Department.objects.get(slug='sales')
+        for viewed in (True, False):
+            CVSubmission.objects.create(applicant_name='Mona', applicant_email='mona@example.com',
+                                        cv_file='cvs/cv.pdf', department=sales, viewed=viewed)
+
+        Department.objects.filter(pk=sales.pk).delete()
+
+        self.assertEqual(CVFolderCount.rebuild(), {})
+        folder = CVFolderCount.objects.get(pk=CVFolderCount.UNASSIGNED)
+        self.assertEqual((folder.total, folder.unseen), (2, 1))
+
+
+class AdminTests(TestCase):
+    def setUp(self):
+        self.sales = Department.objects.get(slug='sales')
+        for i in range(5):
+            CVSubmission.objects.create(applicant_name=f'Applicant {i}', applicant_email=f'a{i}@example.com',
+                                        cv_file='cvs/cv.pdf', department=self.sales)
+
+    def test_count_is_capped_past_the_requested_page_only(self):
+        queryset = CVSubmission.objects.order_by('pk')
+        with mock.patch.object(LargeTablePaginator, 'COUNT_LIMIT', 2):
+            first = LargeTablePaginator(queryset, 1)
+            self.assertEqual((first.count, first.count_prefix), (3, 'More than '))
+            # The last page shown there can be opened, and counts further.
+            later = LargeTablePaginator(queryset, 1, page_hint=first.num_pages)
+            self.assertEqual((later.count, later.count_prefix), (5, ''))
+
+    def test_delete_selected_keeps_the_folder_counters(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        url = reverse('admin:jobs_cvsubmission_changelist')
+        # Not linked to a candidate yet, and still listed.
+        self.assertEqual(self.client.get(url).context['cl'].result_count, 5)
+        self.client.post(url, {
+            'action': 'delete_selected', 'post': 'yes', 'index': 0,
+            '_selected_action': list(CVSubmission.objects.values_list('pk', flat=True)[:2]),
+        })
+        self.assertEqual(CVSubmission.objects.count(), 3)
+        self.assertEqual(CVFolderCount.rebuild(), {})
+
+
+@override_settings(METRICS_TOKEN='s3cret')
+class MetricsTests(TestCase):
+    def test_scraper_needs_the_token_not_a_local_address(self):
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='127.0.0.1').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer é').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.hr = User.objects.create_user('hr', is_staff=True)
+        CVSubmission.objects.create(applicant_name='Mona', applicant_email='mona@example.com', cv_file='cvs/cv.pdf')
+        self.client.force_login(self.hr)
+
+    def test_bell_is_cached_until_the_cvs_are_seen(self):
+        url = reverse('interviewer-availability')
+        with CaptureQueriesContext(connections['default']) as cold:
+            self.assertContains(self.client.get(url), 'Mona')
+        with CaptureQueriesContext(connections['default']) as warm:
+            self.assertContains(self.client.get(url), 'Mona')
+        self.assertEqual(len(cold) - len(warm), 2)
+
+        self.client.get(reverse('view-general-submissions'))
+        self.assertNotContains(self.client.get(url), 'Mona')
+
+    def test_bell_lists_only_the_newest(self):
+        for i in range(NOTIFICATIONS_SHOWN + 2):
+            CVSubmission.objects.create(applicant_name=f'Applicant {i}', applicant_email='a@example.com', cv_file='cvs/cv.pdf')
+        request = RequestFactory().get('/')
+        request.user = self.hr
+        context = notifications(request)
+        self.assertEqual(len(context['unseen_cvs']), NOTIFICATIONS_SHOWN)
+        self.assertEqual(context['unseen_cvs'][0]['name'], f'Applicant {NOTIFICATIONS_SHOWN + 1}')
+        self.assertEqual(context['total_unseen_notifications'], NOTIFICATIONS_SHOWN + 3)
+        self.assertContains(self.client.get(reverse('interviewer-availability')), f'See all {NOTIFICATIONS_SHOWN + 3} new CVs')
+
+    def test_nothing_is_loaded_until_the_template_asks(self):
+        request = RequestFactory().get('/')
+        request.user = self.hr
+        with self.assertNumQueries(0):
+            context = notifications(request)
+        with self.assertNumQueries(2):
+            self.assertEqual(context['total_unseen_notifications'], 1)
+            self.assertEqual([cv['name'] for cv in context['unseen_cvs']], ['Mona'])
+
+
+class JobWindowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        hr = User.objects.create_user('hr', is_staff=True)
+        now = timezone.now()
+        cls.jobs = {
+            title: Job.objects.create(
+                title=title, description='d', requirements='r', location='Cairo', created_by=hr,
+                publish_at=now + publish, close_at=close and now + close,
+            )
+            for title, publish, close in [
+                ('Open', -timedelta(days=1), None),
+                ('Scheduled', timedelta(days=1), None),
+                ('Expired', -timedelta(days=2), -timedelta(hours=1)),
+            ]
+        }
+
+    def test_only_jobs_inside_their_window_are_listed(self):
+        response = self.client.get(reverse('job-list'))
+        self.assertEqual([job.title for job in response.context['jobs']], ['Open'])
+        results = self.client.get(reverse('ajax-search-jobs')).json()['results']
+        self.assertEqual([job['title'] for job in results], ['Open'])
+
+        response = self.client.post(reverse('job-detail', kwargs={'pk': self.jobs['Expired'].pk}))
+        self.assertRedirects(response, reverse('job-list'))
+        self.assertFalse(CVSubmission.objects.exists())
+
+    def test_forms_post_to_the_sync_views_under_wsgi(self):
+        job = self.jobs['Open']
+        response = self.client.get(reverse('job-detail', kwargs={'pk': job.pk}))
+        self.assertContains(response, f'action="{reverse("job-detail", kwargs={"pk": job.pk})}"')
+
+    def test_invalid_cv_upload_shows_the_form_again(self):
+        job = self.jobs['Open']
+        response = self.client.post(reverse('submit-cv', kwargs={'pk': job.pk}), {'full_name': 'Mona'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'not accepting applications')
+        self.assertTrue(response.context['form'].errors)
+        self.assertContains(response, f'action="{reverse("job-detail", kwargs={"pk": job.pk})}"')
+
+    def test_close_expired_jobs_in_batches(self):
+        with self.assertNumQueries(2):
+            call_command('close_expired_jobs', stdout=StringIO())
+        self.assertEqual(
+            dict(Job.objects.values_list('title', 'is_active')),
+            {'Open': True, 'Scheduled': True, 'Expired': False},
+        )
+
+
+class CandidateTests(TestCase):
+    def test_backfill_links_rows_by_normalized_email(self):
+        hr = User.objects.create_user('hr', is_staff=True)
+        CVSubmission.objects.create(applicant_name='Mona', applicant_email='Mona@Example.com ', cv_file='cvs/cv.pdf')
+        link = ApplicationLink.objects.create(created_by=hr, expires_at=timezone.now())
+        application = DetailedApplication.objects.create(
+            link=link, full_name='Mona Ali', email='mona@example.com', phone_number='0100')
+
+        call_command('backfill_candidates', batch_size=1, stdout=StringIO())
+
+        candidate = Candidate.objects.get()
+        self.assertEqual((candidate.email, candidate.full_name), ('mona@example.com', 'Mona'))
+        self.assertEqual(list(candidate.cv_submissions.all()), list(CVSubmission.objects.all()))
+        self.assertEqual(list(candidate.applications.all()), [application])
+
+        # A new submission finds the same candidate and refreshes the name.
+        self.assertEqual(Candidate.for_email('MONA@example.com', 'Mona Ali'), candidate)
+        self.assertEqual(Candidate.objects.get().full_name, 'Mona Ali')
+
+    def test_admin_search_goes_through_the_candidate(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        for name, email in [('Mona Ali', 'mona@example.com'), ('Omar', 'omar@example.com')]:
+            CVSubmission.objects.create(applicant_name=name, applicant_email=email, cv_file='cvs/cv.pdf',
+                                        candidate=Candidate.for_email(email, name))
+        self.client.force_login(admin_user)
+        url = reverse('admin:jobs_cvsubmission_changelist')
+        for term, expected in [(' MONA@example.com', ['Mona Ali']), ('mona a', ['Mona Ali']), ('ali', [])]:
+            response = self.client.get(url, {'q': term})
+            self.assertEqual([cv.applicant_name for cv in response.context['cl'].result_list], expected)
+
+
+class LinkClaimTests(TestCase):
+    FORM = {'full_name': 'Mona Ali', 'email': 'mona@example.com', 'phone_number': '0100'}
+
+    def setUp(self):
+        cache.clear()
+        self.hr = User.objects.create_user('hr', is_staff=True)
+        self.link = ApplicationLink.objects.create(created_by=self.hr, expires_at=timezone.now() + timedelta(days=1))
+        self.url = reverse('application-form', kwargs={'token': self.link.token})
+
+    def submit_with(self, link):
+        # As if the view's checks passed just before another request got in.
+        request = RequestFactory().post(self.url, self.FORM)
+        return save_detailed_application(request, link)
+
+    def test_a_link_is_claimed_once(self):
+        self.assertTemplateUsed(self.client.post(self.url, self.FORM), 'jobs/application_success.html')
+        self.assertContains(self.client.post(self.url, self.FORM), 'already been used')
+
+        # The loser of a race gets past the view's is_used check with a stale link.
+        stale = ApplicationLink.objects.get(pk=self.link.pk)
+        stale.is_used = False
+        self.assertEqual(self.submit_with(stale), (None, None))
+        self.assertEqual(DetailedApplication.objects.count(), 1)
+
+    def test_an_expired_link_cannot_be_claimed(self):
+        ApplicationLink.objects.filter(pk=self.link.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.submit_with(self.link), (None, None))
+        self.assertTemplateUsed(self.client.post(self.url, self.FORM), 'jobs/link_expired.html')
+        self.assertFalse(DetailedApplication.objects.exists())
+        self.assertFalse(ApplicationLink.objects.get(pk=self.link.pk).is_used)
+
+    def test_an_invalid_form_leaves_the_link_usable(self):
+        response = self.client.post(self.url, {**self.FORM, 'email': 'not an email'})
+        self.assertTrue(response.context['form'].errors)
+        self.assertFalse(ApplicationLink.objects.get(pk=self.link.pk).is_used)
+
+        self.assertTemplateUsed(self.client.post(self.url, self.FORM), 'jobs/application_success.html')
+        self.assertTrue(ApplicationLink.objects.get(pk=self.link.pk).is_used)
+        self.assertEqual(DetailedApplication.objects.count(), 1)
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        hr = User.objects.create_user('hr', is_staff=True)
+        sales = Department.objects.get(slug='sales')
+        long_ago = timezone.now() - timedelta(days=400)
+        for i, viewed in enumerate([True, False, False]):
+            CVSubmission.objects.create(applicant_name=f'Old {i}', applicant_email='old@example.com',
+                                        cv_file='cvs/cv.pdf', department=sales, viewed=viewed)
+        CVSubmission.objects.update(submitted_at=long_ago)
+        CVSubmission.objects.create(applicant_name='New', applicant_email='new@example.com',
+                                    cv_file='cvs/cv.pdf', department=sales)
+
+        cls.applications = {}
+        for name, status in [('rejected', 'rejected'), ('hired', 'hired'), ('in review', 'review')]:
+            link = ApplicationLink.objects.create(created_by=hr, expires_at=long_ago)
+            cls.applications[name] = DetailedApplication.objects.create(
+                link=link, full_name=name, email='c@example.com', phone_number='0100', overall_status=status)
+        DetailedApplication.objects.update(submitted_at=long_ago)
+        for name, start in [('rejected', long_ago), ('hired', timezone.now() + timedelta(days=1))]:
+            Interview.objects.create(application=cls.applications[name], stage='ceo', interviewer=hr,
+                                     start=start, end=start + timedelta(hours=1))
+
+    def test_archives_once(self):
+        call_command('archive_old_records', stdout=StringIO())
+        out = StringIO()
+        call_command('archive_old_records', stdout=out)
+        self.assertIn('Archived 0 CV submissions and 0 applications', out.getvalue())
+
+        self.assertEqual(list(CVSubmission.objects.values_list('applicant_name', flat=True)), ['New'])
+        self.assertEqual(ArchivedCVSubmission.objects.count(), 3)
+        self.assertEqual(CVFolderCount.rebuild(), {})
+
+        # The rejected application leaves with its link and its past interview;
+        # the hired one waits for its upcoming interview.
+        self.assertEqual(list(ArchivedApplication.objects.values_list('full_name', flat=True)), ['rejected'])
+        self.assertEqual(sorted(DetailedApplication.objects.values_list('full_name', flat=True)), ['hired', 'in review'])
+        self.assertFalse(ApplicationLink.objects.filter(pk=self.applications['rejected'].link_id).exists())
+        self.assertEqual(list(Interview.objects.values_list('application__full_name', flat=True)), ['hired'])
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        hr = User.objects.create_user('hr', is_staff=True)
+        self.feed = CalendarFeed.objects.create(user=hr)
+        self.url = reverse('interview-calendar-feed', kwargs={'token': self.feed.token})
+        link = ApplicationLink.objects.create(created_by=hr, expires_at=timezone.now())
+        self.application = DetailedApplication.objects.create(
+            link=link, full_name='Mona Ali', email='mona@example.com', phone_number='0100',
+            interview_date=timezone.now() + timedelta(days=1))
+
+    def test_unchanged_feed_answers_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertIn(b'Mona Ali', b''.join(response.streaming_content))
+        etag = response['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        # Moving the interview changes the feed, and so its ETag.
+        DetailedApplication.objects.filter(pk=self.application.pk).update(
+            interview_date=self.application.interview_date + timedelta(hours=2))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unknown_token_is_not_found(self):
+        url = reverse('interview-calendar-feed', kwargs={'token': '00000000-0000-0000-0000-000000000000'})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class DepartmentMigrationTests(TransactionTestCase):
+    serialized_rollback = True  # keeps the departments seeded by the migrations for the other tests
+    before, after = [('jobs', '0021_department')], [('jobs', '0023_department_foreign_keys')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes('jobs'))
+
+    def test_spellings_merge_into_one_department_each_and_back(self):
+        apps = self.migrate(self.before)
+        hr = apps.get_model('auth', 'User').objects.create(username='hr')
+        Job, CVSubmission = apps.get_model('jobs', 'Job'), apps.get_model('jobs', 'CVSubmission')
+        for department in ['it', 'IT', 'hr']:
+            Job.objects.create(title=department, description='d', requirements='r', location='Cairo',
+                               created_by=hr, department=department)
+        for department in ['IT', ' marketing ', 'Marketing', 'Human Resources', 'HR', 'Legal Affairs']:
+            CVSubmission.objects.create(applicant_name=department, applicant_email='a@example.com',
+                                        cv_file='cvs/cv.pdf', department=department)
+
+        apps = self.migrate(self.after)
+        Department = apps.get_model('jobs', 'Department')
+        self.assertEqual(Department.objects.filter(slug='legal-affairs').get().name, 'Legal Affairs')
+        self.assertEqual(Department.objects.count(), 8)  # the seven canonical ones and 'Legal Affairs'
+        self.assertEqual(dict(apps.get_model('jobs', 'Job').objects.values_list('title', 'department__slug')),
+                         {'it': 'it', 'IT': 'it', 'hr': 'hr'})
+        self.assertEqual(dict(apps.get_model('jobs', 'CVSubmission').objects.values_list('applicant_name', 'department__slug')), {
+            'IT': 'it', ' marketing ': 'marketing', 'Marketing': 'marketing',
+            'Human Resources': 'hr', 'HR': 'hr', 'Legal Affairs': 'legal-affairs',
+        })
+
+        apps = self.migrate(self.before)
+        # Jobs were keyed by slug, CVs by 'HR'/'IT' or the department name.
+        self.assertEqual(sorted(apps.get_model('jobs', 'Job').objects.values_list('department', flat=True)), ['hr', 'it', 'it'])
+        self.assertEqual(
+            dict(apps.get_model('jobs', 'CVSubmission').objects.values_list('applicant_name', 'department')),
+            {'IT': 'IT', ' marketing ': 'Marketing', 'Marketing': 'Marketing',
+             'Human Resources': 'HR', 'HR': 'HR', 'Legal Affairs': 'Legal Affairs'},
+        )
+
+
+class PurgeExpiredLinksTests(TestCase):
+    def test_links_with_an_application_are_kept(self):
+        hr = User.objects.create_user('hr', is_staff=True)
+        expired = timezone.now() - timedelta(days=30)
+        bare = ApplicationLink.objects.create(created_by=hr, expires_at=expired)
+        # Flagged too late: the confirmation email failed after the save.
+        unflagged = ApplicationLink.objects.create(created_by=hr, expires_at=expired)
+        application = DetailedApplication.objects.create(
+            link=unflagged, full_name='Mona', email='mona@example.com', phone_number='0100')
+
+        out = StringIO()
+        call_command('purge_expired_links', dry_run=True, stdout=out)
+        self.assertIn('1 expired links would be purged', out.getvalue())
+
+        call_command('purge_expired_links', stdout=StringIO())
+        self.assertEqual(list(ApplicationLink.objects.all()), [unflagged])
+        self.assertTrue(DetailedApplication.objects.filter(pk=application.pk).exists())
+        self.assertFalse(ApplicationLink.objects.filter(pk=bare.pk).exists())
+
+
+class StageDecisionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.hr = User.objects.create_user('hr', is_staff=True)
+        cls.applications = {}
+        for name, statuses in [
+            ('at phone', {}),
+            ('at hr', {'phone_status': 'passed'}),
+            ('rejected at hr', {'phone_status': 'passed', 'hr_status': 'failed', 'overall_status': 'rejected'}),
+        ]:
+            link = ApplicationLink.objects.create(created_by=cls.hr, expires_at=timezone.now())
+            cls.applications[name] = DetailedApplication.objects.create(
+                link=link, full_name=name, email='c@example.com', phone_number='0100', **statuses)
+
+    def names(self, queryset):
+        return sorted(queryset.values_list('full_name', flat=True))
+
+    def test_at_stage(self):
+        self.assertEqual(self.names(DetailedApplication.objects.filter(DetailedApplication.at_stage('phone'))), ['at phone'])
+        self.assertEqual(self.names(DetailedApplication.objects.filter(DetailedApplication.at_stage('hr'))), ['at hr'])
+        self.assertFalse(DetailedApplication.objects.filter(DetailedApplication.at_stage('ceo')).exists())
+
+    def test_sql_overall_status_agrees_with_python(self):
+        application = self.applications['at phone']
+        queryset = DetailedApplication.objects.filter(pk=application.pk)
+        statuses = [DetailedApplication.STATUS_PENDING, DetailedApplication.STATUS_PASSED, DetailedApplication.STATUS_FAILED]
+        for combination in itertools.product(statuses, repeat=len(DetailedApplication.STAGES)):
+            columns = {f'{stage}_status': status for stage, status in zip(DetailedApplication.STAGES, combination)}
+            with self.subTest(**columns):
+                # The hr value comes from the UPDATE itself, the others from their columns.
+                queryset.update(**columns)
+                queryset.update(overall_status=DetailedApplication.overall_status_expression(hr=columns['hr_status']))
+                application.refresh_from_db()
+                self.assertEqual(application.overall_status, application.decide_overall_status())
+        # The rule itself: hired, rejected, in review.
+        for stages, expected in [
+            ({'phone': 'passed', 'hr': 'passed', 'technical': 'passed', 'ceo': 'passed'}, 'hired'),
+            ({'phone': 'passed', 'hr': 'failed', 'technical': 'pending', 'ceo': 'pending'}, 'rejected'),
+            ({'phone': 'passed', 'hr': 'pending', 'technical': 'pending', 'ceo': 'pending'}, 'review'),
+        ]:
+            queryset.update(**{f'{stage}_status': status for stage, status in stages.items()},
+                            overall_status=DetailedApplication.overall_status_expression(**stages))
+            self.assertEqual(queryset.get().overall_status, expected)
+
+    def test_bulk_update_only_touches_applications_at_the_stage(self):
+        self.client.force_login(self.hr)
+        with mock.patch('jobs.views.send_in_background') as send:
+            self.client.post(reverse('bulk-update-application-status'), {
+                'stage': 'hr', 'status': 'passed', 'scope': 'all',
+            })
+
+        self.assertEqual(
+            dict(DetailedApplication.objects.values_list('full_name', 'hr_status')),
+            {'at phone': 'pending', 'at hr': 'passed', 'rejected at hr': 'failed'},
+        )
+        self.assertEqual(self.names(DetailedApplication.objects.filter(overall_status='rejected')), ['rejected at hr'])
+        self.assertEqual(list(StageTransition.objects.values_list('application__full_name', 'stage', 'to_status')),
+                         [('at hr', 'hr', 'passed')])
+        # The notifications are handed to the background sender.
+        _, applications, stage, status = send.call_args.args
+        self.assertEqual(([a.full_name for a in applications], stage, status), (['at hr'], 'hr', 'passed'))
+
+
+class StageMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        hr = User.objects.create_user('hr', is_staff=True)
+        cls.sales = Department.objects.get(slug='sales')
+        job = Job.objects.create(title='Sales Rep', department=cls.sales, description='d',
+                                 requirements='r', location='Cairo', created_by=hr)
+        cls.now = timezone.now()
+        cls.applications = []
+        for i in range(3):
+            link = ApplicationLink.objects.create(job=job, created_by=hr, expires_at=cls.now)
+            application = DetailedApplication.objects.create(
+                link=link, full_name=f'Candidate {i}', email=f'c{i}@example.com', phone_number='0100')
+            DetailedApplication.objects.filter(pk=application.pk).update(submitted_at=cls.now - timedelta(hours=10))
+            cls.applications.append(DetailedApplication.objects.select_related('link__job').get(pk=application.pk))
+        StageTransition.log([
+            (application, 'phone', StageTransition.ENTERED, DetailedApplication.STATUS_PENDING)
+            for application in cls.applications
+        ])
+        first = cls.applications[0]
+        with mock.patch('django.utils.timezone.now', return_value=cls.now - timedelta(hours=4)):
+            StageTransition.log([(first, 'phone', 'pending', 'passed')])
+        StageTransition.log([(first, 'hr', 'pending', 'failed')])
+
+    def test_log_chains_the_time_each_stage_was_entered(self):
+        entered = dict(StageTransition.objects.filter(application=self.applications[0])
+                       .exclude(from_status=StageTransition.ENTERED).values_list('stage', 'stage_entered_at'))
+        # The phone stage starts on submission, the next one when the phone stage is passed.
+        self.assertEqual(entered, {'phone': self.now - timedelta(hours=10), 'hr': self.now - timedelta(hours=4)})
+
+    def test_reports(self):
+        # Deleting the link cascades to its application; its history stays behind.
+        self.applications[2].link.delete()
+
+        out = StringIO()
+        call_command('stage_metrics', stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report['time_in_stage_hours'], {self.sales.name: {
+            'phone': {'median': 6.0, 'decisions': 1},
+            'hr': {'median': 4.0, 'decisions': 1},
+        }})
+        self.assertEqual({stage: list(weeks.values()) for stage, weeks in report['throughput'].items()}, {
+            'phone': [{'passed': 1, 'failed': 0}],
+            'hr': [{'passed': 0, 'failed': 1}],
+        })
+        self.assertEqual(list(report['backlog']), ['phone'])
+        self.assertEqual(report['backlog']['phone']['waiting'], 1)
+
+
+@override_settings(INTERVIEW_SLOT_MINUTES=60)
+class SchedulingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.hr = User.objects.create_user('hr', is_staff=True)
+        cls.day = timezone.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        # 09:00-11:00, two interviews at a time.
+        InterviewerAvailability.objects.create(
+            interviewer=cls.hr, start=cls.day, end=cls.day + timedelta(hours=2), capacity=2)
+        cls.applications = []
+        for i in range(5):
+            link = ApplicationLink.objects.create(created_by=cls.hr, expires_at=cls.day)
+            cls.applications.append(DetailedApplication.objects.create(
+                link=link, full_name=f'Candidate {i}', email=f'c{i}@example.com', phone_number='0100'))
+        Interview.objects.create(
+            application=cls.applications[0], stage='phone', interviewer=cls.hr,
+            start=cls.day, end=cls.day + timedelta(hours=1))
+
+    def test_plan_fills_free_seats_in_two_queries(self):
+        with self.assertNumQueries(2):
+            proposals, unplaced = scheduling.plan(self.applications[1:], [self.hr.pk], self.day - timedelta(hours=1))
+        self.assertEqual([start.hour for _, _, start, _ in proposals], [self.day.hour, self.day.hour + 1, self.day.hour + 1])
+        self.assertEqual(unplaced, [self.applications[4]])
+
+    def test_book_refuses_a_full_slot(self):
+        start, end = self.day, self.day + timedelta(hours=1)
+        scheduling.book([(self.applications[1], self.hr.pk, start, end)], 'phone')
+        self.assertEqual(DetailedApplication.objects.get(pk=self.applications[1].pk).interview_date, start)
+
+        with self.assertRaisesMessage(scheduling.SchedulingConflict, 'Candidate 2: the'):
+            scheduling.book([(self.applications[2], self.hr.pk, start, end)], 'phone')
+        with self.assertRaisesMessage(scheduling.SchedulingConflict, 'outside'):
+            scheduling.book([(self.applications[2], self.hr.pk, end + timedelta(hours=1), end + timedelta(hours=2))], 'phone')
+        self.assertFalse(Interview.objects.filter(application=self.applications[2]).exists())
+
+    def test_passing_a_booked_stage_keeps_its_interview(self):
+        application = self.applications[1]
+        start = self.day + timedelta(hours=1)
+        scheduling.book([(application, self.hr.pk, start, start + timedelta(hours=1))], 'phone')
+        self.client.force_login(self.hr)
+
+        # The form re-posts the booked interviewer and date along with the decision.
+        response = self.client.post(reverse('update-application-status', kwargs={'pk': application.pk}), {
+            'save_status': '1', 'phone_status': 'passed', 'phone_comment': '', 'interviewer': self.hr.pk,
+            'interview_date': timezone.localtime(start).strftime('%Y-%m-%dT%H:%M'),
+        }, follow=True)
+
+        self.assertContains(response, 'updated successfully')
+        application.refresh_from_db()
+        self.assertEqual(application.phone_status, 'passed')
+        self.assertEqual(list(application.interviews.values_list('stage', 'start')), [('phone', start)])
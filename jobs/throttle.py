@@ -0,0 +1,143 @@
+"""
+Cache-backed token-bucket rate limiting for the public endpoints.
+
+Each (scope, client) pair owns a bucket that holds at most N tokens and
+refills at N per period, where THROTTLE_RATES maps the scope to "N/period".
+A request takes one token. When the bucket is empty the view is not called
+and the client gets a 429 with a Retry-After header. Upload scopes use
+``only_accepted``: the view calls accept(request) once it has stored the
+submission, and only then is a token spent, so an invalid form or a closed
+job does not use up the client's uploads.
+
+Clients are told apart by IP address. Behind reverse proxies, REMOTE_ADDR
+is the nearest proxy's address, so set TRUSTED_PROXY_HOPS to the number of
+proxies in front of Django: the client IP is then read from
+X-Forwarded-For, that many entries from the right (the entries further
+left are whatever the client sent, and cannot be trusted).
+
+Buckets live in the default cache: share it between workers (REDIS_URL) or
+every worker process keeps its own buckets. The read-modify-write is not
+atomic, so concurrent requests from one client may slightly exceed the
+limit. That is fine for keeping bots and scrapers in check.
+"""
+
+import math
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from . import metrics
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'30/m' -> (30, 60): bucket capacity and refill period in seconds."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0].lower()]
+
+
+def client_ip(request):
+    """The client's address, looking past the TRUSTED_PROXY_HOPS proxies in front of Django."""
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops:
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if forwarded:
+            # Each proxy appends the address it got the request from.
+            return forwarded[-min(hops, len(forwarded))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def client_key(request, key):
+    """Identifies the client by IP address, or by session when it has one."""
+    if key == 'session' and request.session.session_key:
+        return f'session:{request.session.session_key}'
+    return f"ip:{client_ip(request)}"
+
+
+def accept(request):
+    """Marks the request as accepted, so an ``only_accepted`` throttle spends its token."""
+    request.throttle_accepted = True
+
+
+def take_token(scope, ident, now=None, consume=True):
+    """
+    Takes a token from the bucket (or, with ``consume=False``, only checks
+    there is one). Returns 0 if the request may proceed, or the number of
+    seconds until the next token otherwise.
+    """
+    capacity, period = parse_rate(settings.THROTTLE_RATES[scope])
+    refill_per_second = capacity / period
+    now = time.time() if now is None else now
+    cache_key = f'throttle:{scope}:{ident}'
+
+    tokens, updated = cache.get(cache_key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+    if tokens < 1:
+        retry_after = math.ceil((1 - tokens) / refill_per_second)
+        metrics.THROTTLED.labels(scope, 'throttled').inc()
+        return retry_after
+
+    if consume:
+        # Expire idle buckets once they would have refilled anyway.
+        cache.set(cache_key, (tokens - 1, now), timeout=period)
+        metrics.THROTTLED.labels(scope, 'allowed').inc()
+    return 0
+
+
+def too_many_requests(request, retry_after):
+    # Pages get a friendly page, fetch()/XHR calls get JSON.
+    if 'text/html' in request.headers.get('Accept', ''):
+        response = render(request, 'jobs/rate_limited.html', {'retry_after': retry_after}, status=429)
+    else:
+        response = JsonResponse({'error': 'Too many requests.', 'retry_after': retry_after}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def throttle(scope, key='ip', methods=None, only_accepted=False):
+    """
+    Limits a view with the token bucket configured as THROTTLE_RATES[scope].
+    ``key`` is 'ip' or 'session'. ``methods`` restricts the limit to some
+    HTTP methods (e.g. ('POST',) for uploads). With ``only_accepted`` an
+    empty bucket still refuses the request, but a token is only spent if the
+    view called accept(request). Works on sync and async views.
+    """
+    def applies(request):
+        return methods is None or request.method in methods
+
+    def spends_after(request):
+        return only_accepted and getattr(request, 'throttle_accepted', False)
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                if not applies(request):
+                    return await view_func(request, *args, **kwargs)
+                retry_after = await sync_to_async(take_token)(scope, client_key(request, key), consume=not only_accepted)
+                if retry_after:
+                    return await sync_to_async(too_many_requests)(request, retry_after)
+                response = await view_func(request, *args, **kwargs)
+                if spends_after(request):
+                    await sync_to_async(take_token)(scope, client_key(request, key))
+                return response
+        else:
+            @wraps(view_func)
+            def _wrapped_view(request, *args, **kwargs):
+                if not applies(request):
+                    return view_func(request, *args, **kwargs)
+                retry_after = take_token(scope, client_key(request, key), consume=not only_accepted)
+                if retry_after:
+                    return too_many_requests(request, retry_after)
+                response = view_func(request, *args, **kwargs)
+                if spends_after(request):
+                    take_token(scope, client_key(request, key))
+                return response
+        return _wrapped_view
+    return decorator
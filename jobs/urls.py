@@ -1,5 +1,6 @@
 from django.urls import path
 from . import views
+from .db import query_budget
 from django.shortcuts import render
 
 urlpatterns = [
@@ -7,7 +8,12 @@ urlpatterns = [
     path('', views.JobListView.as_view(), name='job-list'),
     path('job/<int:pk>/', views.JobDetailView.as_view(), name='job-detail'),
     path('apply/<uuid:token>/', views.application_form_view, name='application-form'),
-    path('application-success/', lambda request: render(request, 'jobs/application_success.html'), name='application-success'),
+    # Async upload endpoints: the forms post here only when served over ASGI
+    # (views.cv_submit_url); under WSGI they post back to the sync views above.
+    path('job/<int:pk>/submit/', views.submit_cv, name='submit-cv'),
+    path('apply/general/submit/', views.submit_cv, name='submit-general-cv'),
+    path('apply/<uuid:token>/submit/', views.submit_application, name='submit-application'),
+    path('application-success/', query_budget(2)(lambda request: render(request, 'jobs/application_success.html')), name='application-success'),
     # HR Facing URLs
     path('hr/dashboard/', views.hr_dashboard, name='hr-dashboard'),
     path('hr/job/new/', views.JobCreateView.as_view(), name='job-create'),
@@ -18,12 +24,22 @@ urlpatterns = [
     path('hr/links/generate/', views.generate_application_link, name='generate-link'),
     path('hr/applications/', views.view_detailed_applications, name='view-detailed-applications'), 
     path('dashboard/application/<int:pk>/status/', views.update_application_status, name='update-application-status'),
+    path('dashboard/applications/bulk-status/', views.bulk_update_application_status, name='bulk-update-application-status'),
     path('applications/search/', views.ajax_search_applications, name='ajax-search-applications'),
     path('jobs/search/', views.ajax_search_jobs, name='ajax-search-jobs'),
     path('generate-link-from-cv/<int:cv_id>/', views.generate_link_from_cv, name='generate-link-from-cv'),
+    path('hr/cvs/bulk-invite/', views.bulk_invite_from_cvs, name='bulk-invite-from-cvs'),
     path('hr/general-submissions/', views.view_general_submissions, name='view-general-submissions'),
     path('hr/general-applications/', views.view_general_applications, name='view-general-applications'),
     path('apply/general/', views.JobDetailView.as_view(), name='general-application'),
     path('hr/cv-database/', views.cv_database_folders, name='cv-database-folders'),
-    path('hr/cv-database/<str:department_name>/', views.view_department_cvs, name='view-department-cvs'),
+    path('hr/cv-database/<int:department_id>/', views.view_department_cvs, name='view-department-cvs'),
+    path('hr/cv-archive/<int:pk>/download/', views.download_archived_cv, name='download-archived-cv'),
+    path('hr/candidates/<int:pk>/', views.candidate_timeline, name='candidate-timeline'),
+    path('hr/calendar/', views.calendar_subscription, name='calendar-subscription'),
+    path('calendar/<uuid:token>/interviews.ics', views.interview_calendar_feed, name='interview-calendar-feed'),
+    path('hr/availability/', views.interviewer_availability, name='interviewer-availability'),
+    path('hr/interviews/plan/', views.plan_interviews, name='plan-interviews'),
+    path('hr/db-pool/', views.db_pool_status, name='db-pool-status'),
+    path('metrics', views.metrics_view, name='metrics'),
 ]   
@@ -1,35 +1,61 @@
+import gzip
+import hashlib
+import hmac
+import os
+import uuid
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse_lazy, reverse
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.decorators import login_required, user_passes_test
-from .models import Job, CVSubmission, ApplicationLink, DetailedApplication
-from .forms import CVSubmissionForm, DetailedApplicationForm, JobForm, ApplicationLinkForm, ApplicationStatusUpdateForm
+from .models import Job, CVSubmission, ApplicationLink, DetailedApplication, ArchivedApplication, ArchivedCVSubmission, CalendarFeed, Candidate, CVFolderCount, Department, Interview, InterviewerAvailability, StageTransition
+from .forms import CVSubmissionForm, DetailedApplicationForm, JobForm, ApplicationLinkForm, ApplicationStatusUpdateForm, InterviewerAvailabilityForm, InterviewPlanForm
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.contrib import messages
-from django.core.mail import EmailMessage
-from django.template.loader import render_to_string
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.template.loader import get_template, render_to_string
 from django.contrib import messages
 from django.shortcuts import redirect
 from django.core.mail import send_mail
 from django.conf import settings
-from django.db import models
-from django.http import JsonResponse
+from django.db import models, transaction
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
 from django.db.models import Q
 from django.utils.timesince import timesince
-from django.db.models import Count
-from icalendar import Calendar, Event
-import pytz
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.core.cache import cache
+from .context_processors import invalidate_notifications
+from .db import get_pool_stats, is_pinned_to_primary, query_budget, use_replica
+from . import metrics
+from django.utils.decorators import method_decorator
+from django.utils.http import url_has_allowed_host_and_scheme
+from .mail import send_each, send_in_background
+from .throttle import accept, throttle
+from . import scheduling
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+CALENDAR_PRODID = '-//Corona Hiring System//corona.eg//'
+INTERVIEW_LOCATION = "Online / Corona HQ"
+
+STAGE_NAMES = DetailedApplication.STAGE_NAMES
 
 def send_applicant_notification(application, stage_name, new_status, comment):
+    """Sends the stage notification emails built below, one by one."""
+    for email in build_applicant_notification(application, stage_name, new_status, comment):
+        email.send(fail_silently=False)
+
+def build_applicant_notification(application, stage_name, new_status, comment):
     """
-    Sends TWO separate emails:
+    Builds TWO separate emails:
     1. To Applicant: Friendly "Congratulations" or Update email.
     2. To HR: Factual "Interview Scheduled" email (Only if interview is set).
     """
     if new_status == DetailedApplication.STATUS_PENDING:
-        return 
+        return []
 
     job_title = application.link.job.title if application.link.job else "General Application"
     
@@ -64,7 +90,8 @@ def send_applicant_notification(application, stage_name, new_status, comment):
             summary=f"{event_stage_name} with Corona: {application.full_name}", 
             start_time=application.interview_date,
             description=f"Scheduled {event_stage_name} for {job_title}.\n\nNotes: {comment}",
-            location="Online / Corona HQ"
+            location=INTERVIEW_LOCATION,
+            uid=interview_uid(application),
         )
 
     # =====================================================
@@ -92,7 +119,7 @@ def send_applicant_notification(application, stage_name, new_status, comment):
     if ics_data:
         email_app.attach('interview_invite.ics', ics_data, 'text/calendar')
 
-    email_app.send(fail_silently=False)
+    emails = [email_app]
 
     # =====================================================
     # 📧 EMAIL 2: To HR (Factual Template)
@@ -130,71 +157,59 @@ def send_applicant_notification(application, stage_name, new_status, comment):
         if ics_data:
             email_hr.attach('interview_invite.ics', ics_data, 'text/calendar')
 
-        email_hr.send(fail_silently=False)
-        
-def create_calendar_event(summary, start_time, description, location="Online/Phone"):
+        emails.append(email_hr)
+
+    return emails
+
+def create_calendar_event(summary, start_time, description, location="Online/Phone", uid=None):
+    # icalendar is heavy and only needed once an interview is scheduled,
+    # so keep it out of the worker's startup imports.
+    from icalendar import Calendar
+
     cal = Calendar()
-    cal.add('prodid', '-//Corona Hiring System//corona.eg//')
+    cal.add('prodid', CALENDAR_PRODID)
     cal.add('version', '2.0')
+    cal.add_component(interview_event(summary, start_time, description, location, uid))
+    return cal.to_ical()
+
+def interview_event(summary, start_time, description, location, uid=None):
+    from icalendar import Event
 
     event = Event()
+    if uid:
+        # Same UID in the emailed invite and the feed: calendars update the event in place.
+        event.add('uid', uid)
     event.add('summary', summary)
 
     if start_time.tzinfo:
-        start_time = start_time.astimezone(pytz.utc)
+        start_time = start_time.astimezone(dt_timezone.utc)
 
     event.add('dtstart', start_time)
-    # Assume 1 hour duration for interviews
-    event.add('dtend', start_time + timedelta(hours=1))
+    # Interviews last one booking slot
+    event.add('dtend', start_time + timedelta(minutes=settings.INTERVIEW_SLOT_MINUTES))
     event.add('dtstamp', timezone.now())
     event.add('description', description)
     event.add('location', location)
-    
-    cal.add_component(event)
-    return cal.to_ical()
+    return event
+
+def interview_uid(application):
+    return f"application-{application.pk}@corona.eg"
 
 # Helper function to check if a user is HR (staff)
 def is_hr_user(user):
     return user.is_authenticated and user.is_staff
 
-def get_unseen_notifications(request):
-    unseen_cvs = CVSubmission.objects.filter(
-        (Q(job__created_by=request.user) | Q(job__isnull=True)), 
-        viewed=False
-    ).order_by('-submitted_at')
+# The CV and application forms post to the async endpoints only when the
+# site is served over ASGI; under WSGI those would just add a thread hop, so
+# they post back to the sync views instead.
+def cv_submit_url(request, job):
+    if isinstance(request, ASGIRequest):
+        return reverse('submit-cv', kwargs={'pk': job.pk}) if job else reverse('submit-general-cv')
+    return reverse('job-detail', kwargs={'pk': job.pk}) if job else reverse('general-application')
 
-    unseen_applications = DetailedApplication.objects.filter(
-        link__created_by=request.user, 
-        viewed=False
-    ).order_by('-submitted_at')
-
-    # Build quick-link URLs for each notification
-    cvs_data = []
-    for cv in unseen_cvs:
-        if cv.job:
-            title = cv.job.title
-            url = reverse('view-cv-submissions', kwargs={'job_pk': cv.job.id})
-        else:
-            title = "General Application"
-            # Ensure you have a URL pattern named 'view-general-submissions' in urls.py
-            url = reverse('view-general-submissions')
-
-        cvs_data.append({
-            "name": cv.applicant_name,
-            "job_title": title,
-            "url": url
-        })
-
-    apps_data = [
-        {
-            "name": app.full_name,
-            "job_title": app.link.job.title if app.link.job else "General",
-            "url": reverse('update-application-status', kwargs={'pk': app.pk})
-        }
-        for app in unseen_applications
-    ]
-
-    return cvs_data, apps_data
+def application_submit_url(request, link):
+    name = 'submit-application' if isinstance(request, ASGIRequest) else 'application-form'
+    return reverse(name, kwargs={'token': link.token})
 
 class HRRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
     """Mixin to ensure user is logged in and is an HR staff member."""
@@ -203,14 +218,17 @@ class HRRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
 
 # --- Applicant Views ---
 
+@method_decorator(throttle('pages'), name='dispatch')
+@method_decorator(use_replica, name='dispatch')
 class JobListView(ListView):
     """Displays a list of all active jobs for applicants."""
+    query_budget = 5
     model = Job
     template_name = 'jobs/job_list.html'
     context_object_name = 'jobs'
 
     def get_queryset(self):
-        queryset = Job.objects.filter(is_active=True).order_by('-created_at')
+        queryset = Job.open().order_by('-publish_at')
         # 1. Get parameters from the URL
         query = self.request.GET.get('q', '').strip()
         department = self.request.GET.get('department', '').strip()
@@ -224,9 +242,9 @@ class JobListView(ListView):
                 models.Q(location__icontains=query)
             )
 
-        # 3. Apply Department Filter
-        if department:
-            queryset = queryset.filter(department=department)
+        # 3. Apply Department Filter (by its integer key)
+        if department.isdigit():
+            queryset = queryset.filter(department_id=department)
 
         # 4. Apply Location Filter
         if location:
@@ -241,14 +259,17 @@ class JobListView(ListView):
         context['selected_department'] = self.request.GET.get('department', '')
         context['selected_location'] = self.request.GET.get('location', '')
 
-        active_jobs = Job.objects.filter(is_active=True)
+        active_jobs = Job.open()
         
-        context['departments'] = active_jobs.values_list('department', flat=True).distinct().order_by('department')
+        context['departments'] = Department.objects.filter(jobs__in=active_jobs).distinct()
         context['locations'] = active_jobs.values_list('location', flat=True).distinct().order_by('location')
 
         return context
 
+@method_decorator(throttle('pages'), name='get')
+@method_decorator(throttle('cv-upload', only_accepted=True), name='post')
 class JobDetailView(DetailView):
+    query_budget = 3
     model = Job
     template_name = 'jobs/job_detail.html'
     context_object_name = 'job'
@@ -269,6 +290,8 @@ class JobDetailView(DetailView):
             form.fields.pop('department', None)
 
         context['form'] = form
+        context['accepting'] = self.object is None or self.object.is_open()
+        context['submit_url'] = cv_submit_url(self.request, self.object)
         return context
 
     def post(self, request, *args, **kwargs):
@@ -278,64 +301,14 @@ class JobDetailView(DetailView):
             job = self.get_object()
         except Exception:
             pass
+        if job and not job.is_open():
+            messages.error(request, '❌ This job is no longer accepting applications.')
+            return redirect('job-list')
 
-        form = CVSubmissionForm(request.POST, request.FILES)
-        if job:
-            form.fields.pop('department', None)
-
-        if form.is_valid():
-            submission = form.save(commit=False)
-            submission.job = job
-            if job:
-                submission.department = job.department
-            submission.save()
-
-            # =====================================================
-            # 📨 EMAIL 1: Notification to HR (Technical Info)
-            # =====================================================
-            subject_hr = f"New CV Submission: {job.title if job else 'General Application'}"
-            
-            # This uses your existing table-based template for HR
-            html_hr = render_to_string('emails/application_notification.html', {
-                'job': job,
-                'applicant': submission,
-            })
-
-            email_hr = EmailMessage(
-                subject=subject_hr,
-                body=html_hr,
-                from_email='hr.career@corona.eg',
-                to=['hr.career@corona.eg'], # ✅ HR Only
-            )
-            email_hr.content_subtype = 'html'
-
-            # Attach the CV for HR
-            if submission.cv_file:
-                submission.cv_file.open('rb')
-                email_hr.attach(submission.cv_file.name, submission.cv_file.read(), "application/pdf")
-                submission.cv_file.close()
-
-            email_hr.send(fail_silently=False)
-
-            # =====================================================
-            # 📨 EMAIL 2: Acknowledgement to Applicant (Friendly)
-            # =====================================================
-            subject_app = f"We received your CV: {job.title if job else 'General Application'}"
-            
-            # This uses the NEW friendly template
-            html_app = render_to_string('emails/cv_acknowledgement.html', {
-                'job': job,
-                'applicant': submission,
-            })
-
-            send_mail(
-                subject_app,
-                '', # Plain text content (optional)
-                'hr.career@corona.eg',
-                [submission.applicant_email], # ✅ Applicant Only
-                html_message=html_app,
-                fail_silently=False
-            )
+        form, submission = save_cv_submission(request, job)
+        if submission:
+            for email in cv_submission_emails(job, submission):
+                email.send(fail_silently=False)
 
             messages.success(request, 'Your CV has been submitted successfully!')
             if job:
@@ -348,6 +321,8 @@ class JobDetailView(DetailView):
         context['form'] = form
         return self.render_to_response(context)
 
+@query_budget(7)  # POST: + link claim, candidate upsert, application and history inserts
+@throttle('application-submit', methods=('POST',), only_accepted=True)
 def application_form_view(request, token):
     """Handles the detailed application form submitted via a temporary link."""
     try:
@@ -366,113 +341,305 @@ def application_form_view(request, token):
     job = link.job  # can be None for general applications
 
     if request.method == 'POST':
-        form = DetailedApplicationForm(request.POST, request.FILES)
-        # In views.py inside application_form_view
+        form, application = save_detailed_application(request, link)
+        if form is None:
+            # Another submit claimed the link first (or it just expired)
+            return render_link_unavailable(request, link)
+        if application:
+            for email in application_emails(job, application):
+                email.send(fail_silently=False)
+            return render(request, 'jobs/application_success.html', {'job': job})
 
-    # ... (previous code for validation and saving) ...
-        if form.is_valid():
-            application = form.save(commit=False)
-            application.link = link
-            application.save()
+    else:
+        form = DetailedApplicationForm()
 
-            # ✅ Define the base subject
-            if job:
-                subject_base = job.title
-            else:
-                subject_base = "General Application"
-
-            # =====================================================
-            # 📨 EMAIL 1: Notification to HR (Technical Info)
-            # =====================================================
-            # Keep using the existing table-based template for HR
-            html_hr = render_to_string('emails/application_notification.html', {
-                'job': job,
-                'applicant': application,
-            })
+    # Render form (job may be None)
+    return render(request, 'jobs/application_form.html', {
+        'form': form,
+        'link': link,
+        'submit_url': application_submit_url(request, link),
+        'job': job,
+        'page_title': job.title if job else "General Application",
+    })
 
-            send_mail(
-                subject=f"Detailed Application: {subject_base}",
-                message='',
-                from_email='hr.career@corona.eg',
-                recipient_list=['hr.career@corona.eg'], # ✅ HR Only
-                html_message=html_hr,
-                fail_silently=False
-            )
+def save_cv_submission(request, job):
+    """
+    Validates and stores a CV upload (job may be None for general CVs).
+    Returns ``(form, submission)``; submission is None if the form is invalid.
+    """
+    form = CVSubmissionForm(request.POST, request.FILES)
+    if job:
+        form.fields.pop('department', None)
+    if not form.is_valid():
+        return form, None
+
+    submission = form.save(commit=False)
+    submission.job = job
+    submission.candidate = Candidate.for_email(submission.applicant_email, submission.applicant_name)
+    if job:
+        submission.department_id = job.department_id
+    submission.save()
+    invalidate_hr_dashboards()
+    invalidate_notifications()
+    metrics.CV_SUBMISSIONS.labels('job' if job else 'general').inc()
+    metrics.UPLOAD_SIZE.labels('cv').observe(form.cleaned_data['cv_file'].size)
+    accept(request)
+    return form, submission
+
+def cv_submission_emails(job, submission):
+    """The HR notification (CV attached) and the applicant acknowledgement for a new CV."""
+    # =====================================================
+    # 📨 EMAIL 1: Notification to HR (Technical Info)
+    # =====================================================
+    subject_hr = f"New CV Submission: {job.title if job else 'General Application'}"
 
-            # =====================================================
-            # 📨 EMAIL 2: Acknowledgement to Applicant (Friendly)
-            # =====================================================
-            # Use the NEW friendly template created above
-            html_app = render_to_string('emails/detailed_application_acknowledgement.html', {
-                'job': job,
-                'applicant': application,
-            })
+    # This uses your existing table-based template for HR
+    html_hr = render_to_string('emails/application_notification.html', {
+        'job': job,
+        'applicant': submission,
+    })
 
-            send_mail(
-                subject=f"Application Received: {subject_base}",
-                message='',
-                from_email='hr.career@corona.eg',
-                recipient_list=[application.email], # ✅ Applicant Only
-                html_message=html_app,
-                fail_silently=False
-            )
+    email_hr = EmailMessage(
+        subject=subject_hr,
+        body=html_hr,
+        from_email='hr.career@corona.eg',
+        to=['hr.career@corona.eg'], # ✅ HR Only
+    )
+    email_hr.content_subtype = 'html'
 
-            # Mark the link as used
-            link.is_used = True
-            link.save()
+    # Attach the CV for HR
+    if submission.cv_file:
+        submission.cv_file.open('rb')
+        email_hr.attach(submission.cv_file.name, submission.cv_file.read(), "application/pdf")
+        submission.cv_file.close()
 
-            return render(request, 'jobs/application_success.html', {'job': job})
+    # =====================================================
+    # 📨 EMAIL 2: Acknowledgement to Applicant (Friendly)
+    # =====================================================
+    subject_app = f"We received your CV: {job.title if job else 'General Application'}"
 
+    # This uses the NEW friendly template
+    html_app = render_to_string('emails/cv_acknowledgement.html', {
+        'job': job,
+        'applicant': submission,
+    })
+    email_app = EmailMultiAlternatives(subject_app, '', 'hr.career@corona.eg', [submission.applicant_email]) # ✅ Applicant Only
+    email_app.attach_alternative(html_app, 'text/html')
+
+    return [email_hr, email_app]
+
+def save_detailed_application(request, link):
+    """
+    Validates the detailed application form and stores it, claiming the link
+    in the same transaction. Returns ``(form, application)``: application is
+    None if the form is invalid, and form is None if the link was claimed by
+    another submit (or expired) in the meantime.
+    """
+    form = DetailedApplicationForm(request.POST, request.FILES)
+    if not form.is_valid():
+        return form, None
+
+    application = form.save(commit=False)
+    application.link = link
+    with transaction.atomic():
+        # 🔒 Claim the token with one conditional UPDATE: of two concurrent
+        # submits (or a double-click) only one can flip is_used.
+        claimed = ApplicationLink.objects.filter(
+            pk=link.pk, is_used=False, expires_at__gt=timezone.now()
+        ).update(is_used=True)
+        if not claimed:
+            return None, None
+        link.is_used = True
+        application.candidate = Candidate.for_email(application.email, application.full_name)
+        application.save()
+        # 📜 Start of the application's stage history
+        StageTransition.log([(application, 'phone', StageTransition.ENTERED, DetailedApplication.STATUS_PENDING)])
+    invalidate_hr_dashboards()
+    invalidate_notifications()
+    metrics.APPLICATIONS.labels('job' if link.job else 'general').inc()
+    for upload in request.FILES.values():
+        metrics.UPLOAD_SIZE.labels('application').observe(upload.size)
+    accept(request)
+    return form, application
+
+def application_emails(job, application):
+    """The HR notification and the applicant acknowledgement for a new detailed application."""
+    # ✅ Define the base subject
+    if job:
+        subject_base = job.title
     else:
-        form = DetailedApplicationForm()
+        subject_base = "General Application"
 
-    # Render form (job may be None)
-    return render(request, 'jobs/application_form.html', {
-        'form': form,
+    # =====================================================
+    # 📨 EMAIL 1: Notification to HR (Technical Info)
+    # =====================================================
+    # Keep using the existing table-based template for HR
+    html_hr = render_to_string('emails/application_notification.html', {
         'job': job,
-        'page_title': job.title if job else "General Application",
+        'applicant': application,
+    })
+    email_hr = EmailMultiAlternatives(
+        f"Detailed Application: {subject_base}", '', 'hr.career@corona.eg',
+        ['hr.career@corona.eg'], # ✅ HR Only
+    )
+    email_hr.attach_alternative(html_hr, 'text/html')
+
+    # =====================================================
+    # 📨 EMAIL 2: Acknowledgement to Applicant (Friendly)
+    # =====================================================
+    # Use the NEW friendly template created above
+    html_app = render_to_string('emails/detailed_application_acknowledgement.html', {
+        'job': job,
+        'applicant': application,
     })
+    email_app = EmailMultiAlternatives(
+        f"Application Received: {subject_base}", '', 'hr.career@corona.eg',
+        [application.email], # ✅ Applicant Only
+    )
+    email_app.attach_alternative(html_app, 'text/html')
+
+    return [email_hr, email_app]
+
+def render_link_unavailable(request, link):
+    if link.is_expired():
+        return render(request, 'jobs/link_expired.html', {'link': link})
+    return render(request, 'jobs/link_invalid.html', {
+        'message': 'This application link has already been used.'
+    })
+
+# --- Async upload views (ASGI) ---
+# Served by job_portal/asgi.py, these take slow uploads off the worker threads:
+# Django's ASGI handler receives the request body chunk by chunk (spooling it
+# to a temp file) without holding a thread, and the parsing/ORM work below
+# runs in sync_to_async only once the body has fully arrived. The emails are
+# handed to a background sender instead of delaying the response.
+
+@query_budget(5)  # + the candidate upsert
+@throttle('cv-upload', methods=('POST',), only_accepted=True)
+async def submit_cv(request, pk=None):
+    """Async CV upload for a job (or a general CV when ``pk`` is None)."""
+    if request.method != 'POST':
+        return redirect('job-detail', pk=pk) if pk else redirect('general-application')
+
+    job = None
+    if pk:
+        job = await Job.open().filter(pk=pk).afirst()
+        if job is None:
+            messages.error(request, '❌ This job is no longer accepting applications.')
+            return redirect('job-list')
+    form, submission = await sync_to_async(save_cv_submission)(request, job)
+    if not submission:
+        return await sync_to_async(render)(request, 'jobs/job_detail.html', {
+            # Job.open() above already checked the job is taking applications.
+            'job': job, 'form': form, 'accepting': True, 'submit_url': cv_submit_url(request, job),
+        })
+
+    send_in_background(cv_submission_emails, job, submission)
+    messages.success(request, 'Your CV has been submitted successfully!')
+    return redirect('job-detail', pk=job.pk) if job else redirect('general-application')
+
+@query_budget(6)  # + the candidate upsert
+@throttle('application-submit', methods=('POST',), only_accepted=True)
+async def submit_application(request, token):
+    """Async detailed-application submit for a tokenized link."""
+    if request.method != 'POST':
+        return redirect('application-form', token=token)
+
+    link = await ApplicationLink.objects.select_related('job').filter(token=token).afirst()
+    if link is None:
+        return await sync_to_async(render)(request, 'jobs/link_invalid.html')
+    if link.is_expired() or link.is_used:
+        return await sync_to_async(render_link_unavailable)(request, link)
+
+    form, application = await sync_to_async(save_detailed_application)(request, link)
+    if form is None:
+        return await sync_to_async(render_link_unavailable)(request, link)
+    if not application:
+        return await sync_to_async(render)(request, 'jobs/application_form.html', {
+            'form': form,
+            'link': link,
+            'submit_url': application_submit_url(request, link),
+            'job': link.job,
+            'page_title': link.job.title if link.job else "General Application",
+        })
+
+    send_in_background(application_emails, link.job, application)
+    return await sync_to_async(render)(request, 'jobs/application_success.html', {'job': link.job})
 
 # --- HR Views ---
 
-@login_required
-@user_passes_test(is_hr_user)
-def hr_dashboard(request):
-    """Dashboard for HR, showing job stats and links to management pages."""
-    jobs = (
-        Job.objects.filter(created_by=request.user)
-        .annotate(cv_count=Count('submissions', distinct=True))
-        .annotate(application_count=Count('application_links__application_details', distinct=True))
+HR_DASHBOARD_GENERATION_KEY = 'hr-dashboard:generation'
+
+def invalidate_hr_dashboards():
+    """Drops every cached HR dashboard (a new CV or application shows on all of them)."""
+    try:
+        cache.incr(HR_DASHBOARD_GENERATION_KEY)
+    except ValueError:
+        cache.set(HR_DASHBOARD_GENERATION_KEY, 1, None)
+
+def build_hr_dashboard_context(request):
+    user = request.user
+    # Correlated subqueries: counting both relations through joins would
+    # multiply each job's CVs by its links before the DISTINCT.
+    cv_counts = (
+        CVSubmission.objects.filter(job=OuterRef('pk'))
+        .order_by().values('job').annotate(count=Count('pk')).values('count')
+    )
+    application_counts = (
+        DetailedApplication.objects.filter(link__job=OuterRef('pk'))
+        .order_by().values('link__job').annotate(count=Count('pk')).values('count')
+    )
+    jobs = list(
+        Job.objects.filter(created_by=user)
+        .annotate(
+            cv_count=Coalesce(Subquery(cv_counts), 0),
+            application_count=Coalesce(Subquery(application_counts), 0),
+        )
         .order_by('-created_at')
     )
 
     #recent_submissions = CVSubmission.objects.filter(job__created_by=request.user).order_by('-submitted_at')[:10]
     #recent_applications = DetailedApplication.objects.filter(link__created_by=request.user).order_by('-submitted_at')[:10]
-    total_submissions = CVSubmission.objects.filter(job__created_by=request.user).count()
-    total_applications = DetailedApplication.objects.filter(link__created_by=request.user).count()
-    unseen_cvs, unseen_apps = get_unseen_notifications(request)
-    total_unseen_notifications = len(unseen_cvs) + len(unseen_apps)
-    #total_general_submissions = CVSubmission.objects.filter(job__isnull=True).count()
-    # 🆕 General submissions (no job linked)
-    general_cv_count = CVSubmission.objects.filter(job__isnull=True).count()
-    general_app_count = DetailedApplication.objects.filter(link__job__isnull=True).count()
-
-    context = {
+    # One conditional aggregate per table for all the totals
+    cv_totals = CVSubmission.objects.filter(Q(job__created_by=user) | Q(job__isnull=True)).aggregate(
+        total_submissions=Count('pk', filter=Q(job__created_by=user)),
+        new_cvs=Count('pk', filter=Q(job__created_by=user, viewed=False)),
+        # 🆕 General submissions (no job linked)
+        general_cv_count=Count('pk', filter=Q(job__isnull=True)),
+    )
+    application_totals = DetailedApplication.objects.filter(
+        Q(link__created_by=user) | Q(link__job__isnull=True)
+    ).aggregate(
+        total_applications=Count('pk', filter=Q(link__created_by=user)),
+        new_applications=Count('pk', filter=Q(link__created_by=user, viewed=False)),
+        general_app_count=Count('pk', filter=Q(link__job__isnull=True)),
+    )
+    return {
         'jobs': jobs,
         # 'recent_submissions': recent_submissions,
         # 'recent_applications': recent_applications,
-        'total_submissions' : total_submissions,
-        'total_applications' : total_applications,
-        'total_general_submissions': general_cv_count,
-        'general_cv_count': general_cv_count,
-        'general_app_count': general_app_count,
-        'unseen_cvs': unseen_cvs,
-        'unseen_apps': unseen_apps,
-        'total_unseen_notifications': total_unseen_notifications,
+        **cv_totals,
+        **application_totals,
+        'total_general_submissions': cv_totals['general_cv_count'],
     }
+
+@query_budget(7)
+@login_required
+@user_passes_test(is_hr_user)
+def hr_dashboard(request):
+    """Dashboard for HR, showing job stats and links to management pages."""
+    # ⚡ Cached per user for a few seconds; new submissions bump the
+    # generation, and a user who just wrote something always gets a fresh one.
+    generation = cache.get(HR_DASHBOARD_GENERATION_KEY, 0)
+    cache_key = f'hr-dashboard:{generation}:{request.user.pk}'
+    context = None if is_pinned_to_primary(request) else cache.get(cache_key)
+    if context is None:
+        context = build_hr_dashboard_context(request)
+        cache.set(cache_key, context, settings.HR_DASHBOARD_CACHE_SECONDS)
     return render(request, 'jobs/hr_dashboard.html', context)
 
 class JobCreateView(HRRequiredMixin, CreateView):
+    query_budget = 3  # + the department choices
     model = Job
     form_class = JobForm
     template_name = 'jobs/job_form.html'
@@ -483,6 +650,7 @@ class JobCreateView(HRRequiredMixin, CreateView):
         return super().form_valid(form)
 
 class JobUpdateView(HRRequiredMixin, UpdateView):
+    query_budget = 4  # + the department choices
     model = Job
     form_class = JobForm
     template_name = 'jobs/job_form.html'
@@ -492,6 +660,7 @@ class JobUpdateView(HRRequiredMixin, UpdateView):
         return Job.objects.filter(created_by=self.request.user)
 
 class JobDeleteView(HRRequiredMixin, DeleteView):
+    query_budget = 3
     model = Job
     template_name = 'jobs/job_confirm_delete.html'
     success_url = reverse_lazy('hr-dashboard')
@@ -499,21 +668,26 @@ class JobDeleteView(HRRequiredMixin, DeleteView):
     def get_queryset(self):
         return Job.objects.filter(created_by=self.request.user)
 
+@query_budget(4)
 @login_required
 @user_passes_test(is_hr_user)
 def toggle_job_status(request, pk):
     """Toggles the is_active status of a job."""
     job = get_object_or_404(Job, pk=pk, created_by=request.user)
     job.is_active = not job.is_active
+    if job.is_active and job.close_at and job.close_at <= timezone.now():
+        # Reopened by hand: drop the passed closing date, or close_expired_jobs would close it again.
+        job.close_at = None
     job.save()
     return redirect('hr-dashboard')
 
+@query_budget(9)  # marking CVs seen makes the notification bell reload (2)
 @login_required
 @user_passes_test(is_hr_user)
 def view_cv_submissions(request, job_pk):
     """Displays all CV submissions for a specific job."""
     job = get_object_or_404(Job, pk=job_pk, created_by=request.user)
-    submissions = job.submissions.all().order_by('-submitted_at')
+    submissions = job.submissions.select_related('department').order_by('-submitted_at')
 
     # ✅ Handle search and optional department filter
     # 🔍 Get search query
@@ -525,11 +699,9 @@ def view_cv_submissions(request, job_pk):
             Q(applicant_name__icontains=query) |
             Q(applicant_email__icontains=query))
 
-    # Mark unseen submissions as seen
-    for cv in submissions:
-        if not cv.viewed:
-            cv.viewed = True
-            cv.save(update_fields=['viewed'])
+    # Mark unseen submissions as seen (one UPDATE instead of one per CV)
+    if CVSubmission.mark_viewed(submissions):
+        invalidate_notifications()
 
     context = {
         'job': job,
@@ -540,6 +712,7 @@ def view_cv_submissions(request, job_pk):
 
     return render(request, 'jobs/cv_list.html', context)
 
+@query_budget(3)
 @login_required
 @user_passes_test(is_hr_user)   
 def generate_application_link(request):
@@ -560,6 +733,7 @@ def generate_application_link(request):
         
     return render(request, 'jobs/generate_link_form.html', {'form': form})   
 
+@query_budget(6)
 @login_required
 @user_passes_test(is_hr_user)
 def generate_link_from_cv(request, cv_id):
@@ -621,7 +795,69 @@ def generate_link_from_cv(request, cv_id):
         return redirect('view-cv-submissions', job_pk=cv.job.pk)
     else:
         return redirect('view-general-submissions')
+
+
+@query_budget(5)
+@login_required
+@user_passes_test(is_hr_user)
+def bulk_invite_from_cvs(request):
+    """
+    Generate and email application links for every selected CV in one go:
+    one bulk insert, one compiled template and one SMTP connection.
+    """
+    next_url = request.POST.get('next')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = reverse('view-general-submissions')
+    if request.method != 'POST':
+        return redirect(next_url)
+
+    cv_ids = [cv_id for cv_id in request.POST.getlist('cv_ids') if cv_id.isdigit()]
+    # ✅ Same rule as generate_link_from_cv: general CVs, or CVs for the user's own jobs
+    cvs = list(
+        CVSubmission.objects.select_related('job')
+        .filter(pk__in=cv_ids)
+        .filter(Q(job__isnull=True) | Q(job__created_by=request.user))
+    )
+    if not cvs:
+        messages.error(request, "❌ Select at least one CV you are allowed to manage.")
+        return redirect(next_url)
+
+    # ✅ Create every link with one INSERT (tokens are generated client-side)
+    expires_at = timezone.now() + timedelta(days=7)
+    links = ApplicationLink.objects.bulk_create([
+        ApplicationLink(job=cv.job, created_by=request.user, expires_at=expires_at)
+        for cv in cvs
+    ])
+
+    # ✅ Compile the invite template once and render it per candidate
+    template = get_template('emails/detailed_application_invite.html')
+    invites = []
+    for cv, link in zip(cvs, links):
+        job_title = cv.job.title if cv.job else "General Application"
+        subject = "Next Step for Your Application at Corona"
+        if cv.job:
+            subject += f": {job_title}"
+        invite = EmailMultiAlternatives(subject, '', settings.DEFAULT_FROM_EMAIL, [cv.applicant_email])
+        invite.attach_alternative(template.render({
+            'applicant_name': cv.applicant_name,
+            'job_title': job_title,
+            'link': request.build_absolute_uri(reverse('application-form', args=[str(link.token)])),
+        }), 'text/html')
+        invites.append(invite)
+
+    # ✅ Send over a single SMTP connection and report per recipient
+    failed = [(invite.to[0], error) for invite, error in send_each(invites) if error]
+    sent = len(invites) - len(failed)
+    if sent:
+        messages.success(request, f"✅ Application links sent to {sent} candidate(s).")
+    for email, error in failed:
+        messages.error(request, f"❌ Failed to send to {email}: {error}")
+    skipped = len(set(cv_ids)) - len(cvs)
+    if skipped:
+        messages.warning(request, f"⚠️ Skipped {skipped} CV(s) that were not found or that you cannot manage.")
+    return redirect(next_url)
     
+@query_budget(3)
 @login_required
 @user_passes_test(is_hr_user)
 def view_detailed_applications(request, job_pk=None):
@@ -643,7 +879,7 @@ def view_detailed_applications(request, job_pk=None):
             Q(email__icontains=query)
         )
 
-    applications = applications.order_by('-submitted_at')
+    applications = applications.select_related('link__job').order_by('-submitted_at')
 
     context = {
         'applications': applications,
@@ -652,11 +888,12 @@ def view_detailed_applications(request, job_pk=None):
     }
     return render(request, 'jobs/detailed_application_list.html', context)
 
+@query_budget(3)
 @login_required
 @user_passes_test(is_hr_user)
 def view_general_applications(request):
     """Show applications submitted via general links (no specific job)."""
-    applications = DetailedApplication.objects.filter(link__job__isnull=True).order_by('-submitted_at')
+    applications = DetailedApplication.objects.filter(link__job__isnull=True).select_related('link').order_by('-submitted_at')
     
     context = {
         'applications': applications,
@@ -665,6 +902,7 @@ def view_general_applications(request):
     }
     return render(request, 'jobs/detailed_application_list.html', context)
 
+@query_budget(9)  # marking CVs seen makes the notification bell reload (2)
 @login_required
 @user_passes_test(is_hr_user)
 def view_general_submissions(request):
@@ -672,7 +910,7 @@ def view_general_submissions(request):
     query = request.GET.get('q', '').strip()
     department = request.GET.get('department', '').strip()
 
-    submissions = CVSubmission.objects.filter(job__isnull=True).order_by('-submitted_at')
+    submissions = CVSubmission.objects.filter(job__isnull=True).select_related('department').order_by('-submitted_at')
 
     # 🔍 Apply filters
     if query:
@@ -681,22 +919,14 @@ def view_general_submissions(request):
             Q(applicant_email__icontains=query)
         )
 
-    if department:
-        submissions = submissions.filter(department=department)
+    if department.isdigit():
+        submissions = submissions.filter(department_id=department)
         
-    for cv in submissions:
-        if not cv.viewed:
-            cv.viewed = True
-            cv.save(update_fields=['viewed'])
+    if CVSubmission.mark_viewed(submissions):
+        invalidate_notifications()
 
-    # ✅ Dropdown departments (sorted & distinct)
-    departments = (
-        CVSubmission.objects.filter(job__isnull=True)
-        .exclude(department__exact='')
-        .values_list('department', flat=True)
-        .distinct()
-        .order_by('department')
-    )
+    # ✅ Dropdown departments that have general CVs (sorted & distinct)
+    departments = Department.objects.filter(cv_submissions__job__isnull=True).distinct()
 
     context = {
         'job': None,  # cv_list.html expects job
@@ -708,14 +938,17 @@ def view_general_submissions(request):
     }
     return render(request, 'jobs/cv_list.html', context)
 
+@query_budget(16)  # booking an interview adds the interviewer, window lock, overlap check and the write
 @login_required
 @user_passes_test(is_hr_user)
 def update_application_status(request, pk):
     """Handles saving applicant details and interview statuses + stage progression."""
-    application = get_object_or_404(DetailedApplication, pk=pk, link__created_by=request.user)
+    application = get_object_or_404(
+        DetailedApplication.objects.select_related('link__job'), pk=pk, link__created_by=request.user)
     if not application.viewed:
         application.viewed = True
         application.save(update_fields=['viewed'])
+        invalidate_notifications()
 
     # Store old statuses to check what changed
     old_statuses = {
@@ -724,6 +957,8 @@ def update_application_status(request, pk):
         'technical': application.technical_status,
         'ceo': application.ceo_status,
     }
+    # Validating the status form writes into ``application``, so read this first
+    old_waiting_stage = application.waiting_stage
 
     details_form = DetailedApplicationForm(request.POST or None, instance=application)
     status_form = ApplicationStatusUpdateForm(request.POST or None, instance=application)
@@ -733,7 +968,10 @@ def update_application_status(request, pk):
         # --- Save Applicant Details ---
         if 'save_details' in payload:
             if details_form.is_valid():
-                details_form.save()
+                application = details_form.save(commit=False)
+                if 'email' in details_form.changed_data:
+                    application.candidate = Candidate.for_email(application.email, application.full_name)
+                application.save()
                 messages.success(request, f"✅ Applicant details for {application.full_name} updated successfully.")
             else:
                 messages.error(request, "❌ Please correct the applicant details form.")
@@ -751,22 +989,8 @@ def update_application_status(request, pk):
                     application.interview_date = None
 
                 # --- Determine overall status automatically ---
-                if application.ceo_status == DetailedApplication.STATUS_PASSED:
-                    application.overall_status = DetailedApplication.OVERALL_STATUS_HIRED
-                elif any(
-                    s == DetailedApplication.STATUS_FAILED
-                    for s in [
-                        application.phone_status,
-                        application.hr_status,
-                        application.technical_status,
-                        application.ceo_status,
-                    ]
-                ):
-                    application.overall_status = DetailedApplication.OVERALL_STATUS_REJECTED
-                else:
-                    application.overall_status = DetailedApplication.OVERALL_STATUS_REVIEW
+                application.overall_status = application.decide_overall_status()
 
-                application.save()
                 # --- Check for changes and send emails ---
                 new_statuses = {
                     'phone': application.phone_status,
@@ -774,13 +998,39 @@ def update_application_status(request, pk):
                     'technical': application.technical_status,
                     'ceo': application.ceo_status,
                 }
-
-                stage_names = {
-                    'phone': 'Phone Interview',
-                    'hr': 'HR Interview',
-                    'technical': 'Technical Interview',
-                    'ceo': 'CEO Interview',
-                }
+                interviewer = status_form.cleaned_data.get('interviewer')
+                booking = status_form.booking
+                try:
+                    with transaction.atomic():
+                        # 📅 Book the date in the interviewer's availability, or drop
+                        # the upcoming booking the form no longer asks for
+                        waiting_stage = application.waiting_stage
+                        if waiting_stage != old_waiting_stage:
+                            # A stage was decided: the date and interviewer on the form
+                            # belong to it, not to the next stage (book that one later)
+                            if application.overall_status == DetailedApplication.OVERALL_STATUS_REJECTED:
+                                scheduling.cancel([application.pk])
+                        elif interviewer and application.interview_date and waiting_stage:
+                            if (booking is None or 'interview_date' in status_form.changed_data
+                                    or booking.interviewer_id != interviewer.pk):
+                                scheduling.book([(
+                                    application, interviewer.pk, application.interview_date,
+                                    application.interview_date + scheduling.slot_length(),
+                                )], waiting_stage)
+                        elif booking and booking.end > timezone.now():
+                            booking.delete()
+                        application.save()
+                        # 📜 Append the changed stages to the history in the same transaction
+                        StageTransition.log([
+                            (application, stage_key, old_statuses[stage_key], new_statuses[stage_key])
+                            for stage_key in DetailedApplication.STAGES
+                            if old_statuses[stage_key] != new_statuses[stage_key]
+                        ], changed_by=request.user)
+                except scheduling.SchedulingConflict as e:
+                    messages.error(request, f"❌ Interview not booked: {e}.")
+                    return redirect('update-application-status', pk=application.pk)
+
+                stage_names = STAGE_NAMES
                 messages.success(request, f"✅ Interview status for {application.full_name} updated successfully.")
                 for stage_key in stage_names.keys():
                     old_s = old_statuses[stage_key]
@@ -805,8 +1055,87 @@ def update_application_status(request, pk):
         'application': application,
     })
 
+@query_budget(9)  # failing also cancels the upcoming interviews
+@login_required
+@user_passes_test(is_hr_user)
+def bulk_update_application_status(request):
+    """
+    Passes or fails one interview stage for many applications at once with a
+    single set-based UPDATE, then hands the applicant notifications to the
+    background mail sender.
+    """
+    next_url = request.POST.get('next')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = reverse('view-detailed-applications')
+    if request.method != 'POST':
+        return redirect(next_url)
+
+    stage = request.POST.get('stage', '')
+    new_status = request.POST.get('status', '')
+    if stage not in DetailedApplication.STAGES or new_status not in (
+            DetailedApplication.STATUS_PASSED, DetailedApplication.STATUS_FAILED):
+        messages.error(request, "❌ Choose a stage and a result.")
+        return redirect(next_url)
+
+    # ✅ Same sequential rule as the status form: only applications currently at this stage
+    at_stage = DetailedApplication.at_stage(stage)
+    targets = DetailedApplication.objects.filter(at_stage, link__created_by=request.user)
+    job_id = request.POST.get('job', '').strip()
+    if job_id == 'general':
+        targets = targets.filter(link__job__isnull=True)
+    elif job_id.isdigit():
+        targets = targets.filter(link__job_id=job_id)
+    if request.POST.get('scope') != 'all':
+        targets = targets.filter(pk__in=[pk for pk in request.POST.getlist('application_ids') if pk.isdigit()])
+
+    changes = {
+        f'{stage}_status': new_status,
+        # overall_status is recomputed by the database from the new stage value
+        'overall_status': DetailedApplication.overall_status_expression(**{stage: new_status}),
+    }
+    comment = request.POST.get('comment', '').strip()
+    if comment:
+        changes[f'{stage}_comment'] = comment
+    if new_status == DetailedApplication.STATUS_FAILED:
+        changes['interview_date'] = None
+
+    with transaction.atomic():
+        # Lock the matching rows so the notifications go to exactly the ones updated.
+        locked = list(targets.select_for_update(of=('self',)).select_related('link__job'))
+        ids = [application.pk for application in locked]
+        updated = DetailedApplication.objects.filter(at_stage, pk__in=ids).update(**changes)
+        # 📜 Every locked application was pending at this stage
+        StageTransition.log([
+            (application, stage, DetailedApplication.STATUS_PENDING, new_status) for application in locked
+        ], changed_by=request.user)
+        if new_status == DetailedApplication.STATUS_FAILED:
+            scheduling.cancel(ids)
+
+    if not updated:
+        messages.warning(request, f"⚠️ No selected applications are at the {STAGE_NAMES[stage]} stage.")
+        return redirect(next_url)
+
+    # --- Render and send the notifications off the request (failures are logged) ---
+    applications = list(DetailedApplication.objects.filter(pk__in=ids).select_related('link__job'))
+    send_in_background(stage_result_emails, applications, stage, new_status)
+
+    messages.success(
+        request, f"✅ {STAGE_NAMES[stage]} marked {new_status} for {updated} application(s). "
+                 f"The applicants are being notified.")
+    return redirect(next_url)
+
+def stage_result_emails(applications, stage, new_status):
+    """The notifications of a bulk stage decision, one set per application."""
+    emails = []
+    for application in applications:
+        emails += build_applicant_notification(
+            application, STAGE_NAMES[stage], new_status, getattr(application, f'{stage}_comment'))
+    return emails
+
+@query_budget(3)
 @login_required
 @user_passes_test(is_hr_user)
+@use_replica
 def ajax_search_applications(request):
     """Live search for detailed applications (works for specific job or all)."""
     query = request.GET.get("q", "").strip()
@@ -856,24 +1185,27 @@ def ajax_search_applications(request):
 
     return JsonResponse({"results": data})
 
+@query_budget(3)
+@throttle('job-search')
+@use_replica
 def ajax_search_jobs(request):
     query = request.GET.get("q", "").strip()
     department = request.GET.get("department", "").strip()
     location = request.GET.get("location", "").strip()
 
-    jobs = Job.objects.filter(is_active=True)
+    jobs = Job.open()
 
     if query:
         jobs = jobs.filter(
             Q(title__icontains=query) | Q(description__icontains=query) | Q(location__icontains=query)
         )
-    if department:
-        jobs = jobs.filter(department=department)
+    if department.isdigit():
+        jobs = jobs.filter(department_id=department)
 
     if location:
         jobs = jobs.filter(location=location)
 
-    jobs = jobs.order_by("-created_at")[:30]
+    jobs = jobs.order_by("-publish_at")[:30]
 
     data = {
         "results": [
@@ -882,7 +1214,7 @@ def ajax_search_jobs(request):
                 "title": job.title,
                 "location": job.location or "—",
                 "description": (job.description[:120] + "...") if len(job.description) > 120 else job.description,
-                "created_since": timesince(job.created_at) + " ago",
+                "created_since": timesince(job.publish_at) + " ago",
             }
             for job in jobs
         ]
@@ -890,31 +1222,50 @@ def ajax_search_jobs(request):
     return JsonResponse(data)
 
 # 1- CVs database - folders(departments)
+@query_budget(4)
 @login_required
 @user_passes_test(is_hr_user)
+@use_replica
 def cv_database_folders(request):
     """
     Displays a 'Folder' view of all CVs grouped by department.
     """
-    # Group by department and count how many CVs are in each
+    # Read the per-department counters (one row per folder) instead of counting CVs
     departments = (
-        CVSubmission.objects
-        .values('department')
-        .annotate(count=Count('id'))
-        .order_by('department')
+        CVFolderCount.objects.filter(total__gt=0)
+        .annotate(department__name=Subquery(Department.objects.filter(pk=OuterRef('pk')).values('name')))
+        .values('department_id', 'department__name', count=F('total'), unseen_count=F('unseen'))
+        .order_by(F('department__name').asc(nulls_last=True))
     )
-    
+
+    # 🗄️ "Include archive" mode: add the cold-table counts per department
+    include_archive = request.GET.get('archive') == '1'
+    if include_archive:
+        archived = {
+            dept['department_id'] or CVFolderCount.UNASSIGNED: dept
+            for dept in ArchivedCVSubmission.objects.values('department_id', 'department__name').annotate(count=Count('id'))
+        }
+        departments = [
+            {**dept, 'archived_count': archived.pop(dept['department_id'], {}).get('count', 0)} for dept in departments
+        ] + [
+            {**dept, 'count': 0, 'unseen_count': 0, 'archived_count': dept['count']}
+            for dept in sorted(archived.values(), key=lambda dept: dept['department__name'] or '')
+        ]
+
     return render(request, 'jobs/cv_database_folders.html', {
-        'departments': departments
+        'departments': departments,
+        'include_archive': include_archive,
     })
 
+@query_budget(4)
 @login_required
 @user_passes_test(is_hr_user)
-def view_department_cvs(request, department_name):
+def view_department_cvs(request, department_id):
     """
-    Lists all CVs belonging to a specific department folder.
+    Lists all CVs belonging to a specific department folder (0 = unassigned).
     """
-    submissions = CVSubmission.objects.filter(department=department_name).order_by('-submitted_at')
+    department = get_object_or_404(Department, pk=department_id) if department_id else None
+    submissions = CVSubmission.objects.filter(department=department).select_related('department').order_by('-submitted_at')
     
     # Optional: Add search functionality specific to this folder
     query = request.GET.get('q', '').strip()
@@ -924,12 +1275,335 @@ def view_department_cvs(request, department_name):
             Q(applicant_email__icontains=query)
         )
 
+    # 🗄️ "Include archive" mode: search the cold table too, listed separately
+    include_archive = request.GET.get('archive') == '1'
+    archived_submissions = None
+    if include_archive:
+        archived_submissions = (
+            ArchivedCVSubmission.objects.filter(department=department)
+            .select_related('department').order_by('-submitted_at')
+        )
+        if query:
+            archived_submissions = archived_submissions.filter(
+                Q(applicant_name__icontains=query) |
+                Q(applicant_email__icontains=query)
+            )
+
     context = {
         'submissions': submissions,
-        'department_name': department_name,
+        'department_name': department.name if department else 'Unassigned',
         'query': query,
         'job': None, # We pass None because this isn't for a specific job post
+        'archive_enabled': True,
+        'include_archive': include_archive,
+        'archived_submissions': archived_submissions,
     }
     # We reuse your existing cv_list.html but you might need to tweak it slightly
     # to show "Department: Marketing" instead of "Job: X"
-    return render(request, 'jobs/cv_list.html', context)
\ No newline at end of file
+    return render(request, 'jobs/cv_list.html', context)
+
+@query_budget(3)
+@login_required
+@user_passes_test(is_hr_user)
+def download_archived_cv(request, pk):
+    """Serves an archived CV, decompressing it on the fly if it was stored gzipped."""
+    cv = get_object_or_404(ArchivedCVSubmission, pk=pk)
+    if not cv.cv_compressed:
+        return redirect(cv.cv_file.url)
+    filename = os.path.basename(cv.cv_file.name).removesuffix('.gz')
+    return FileResponse(gzip.open(cv.cv_file.open('rb')), filename=filename)
+
+# --- Interview calendar feed ---
+
+def interview_stage_name(application):
+    """Name of the interview an application's interview_date is for."""
+    stage = application.current_stage
+    if stage <= len(DetailedApplication.STAGES):
+        return STAGE_NAMES[DetailedApplication.STAGES[stage - 1]]
+    return 'Final Offer Meeting'
+
+def ics_stream(events):
+    """Yields an ICS calendar one event at a time."""
+    yield (
+        'BEGIN:VCALENDAR\r\n'
+        'VERSION:2.0\r\n'
+        f'PRODID:{CALENDAR_PRODID}\r\n'
+        'X-WR-CALNAME:Corona Interviews\r\n'
+        # Hint for clients that honour it: poll every 15 minutes.
+        'REFRESH-INTERVAL;VALUE=DURATION:PT15M\r\n'
+        'X-PUBLISHED-TTL:PT15M\r\n'
+    ).encode()
+    for event in events:
+        yield interview_event(
+            event['summary'], event['start'], event['description'], INTERVIEW_LOCATION, event['uid'],
+        ).to_ical()
+    yield b'END:VCALENDAR\r\n'
+
+@query_budget(4)  # 2 for calendar apps, + session and user when a staff browser opens it
+@use_replica
+def interview_calendar_feed(request, token):
+    """
+    Read-only ICS feed of an HR user's upcoming interviews, for calendar apps
+    to subscribe to (the token in the URL is the only credential). Clients
+    poll it every few minutes, so an unchanged feed answers 304 from its ETag.
+    """
+    feed = get_object_or_404(CalendarFeed, token=token)
+
+    # 🔎 One range query on the scheduled-interviews index
+    applications = (
+        DetailedApplication.objects
+        .filter(link__created_by_id=feed.user_id, interview_date__gte=timezone.now() - timedelta(days=1))
+        .select_related('link__job')
+        .only('full_name', 'interview_date', 'overall_status',
+              *[f'{stage}_status' for stage in DetailedApplication.STAGES], 'link__job__title')
+        .order_by('interview_date')
+    )
+    events = []
+    for application in applications:
+        stage_name = interview_stage_name(application)
+        job_title = application.link.job.title if application.link.job else "General Application"
+        events.append({
+            'uid': interview_uid(application),
+            'summary': f"{stage_name}: {application.full_name}",
+            'start': application.interview_date,
+            'description': f"Scheduled {stage_name} for {job_title}.",
+        })
+
+    # The ETag covers what the events show, so a poll with nothing new costs
+    # the query but not the calendar rendering.
+    etag = 'W/"%s"' % hashlib.sha1(repr(events).encode()).hexdigest()
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = StreamingHttpResponse(ics_stream(events), content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="interviews.ics"'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=300'
+    return response
+
+@query_budget(6)  # first visit also creates the feed
+@login_required
+@user_passes_test(is_hr_user)
+def calendar_subscription(request):
+    """Shows the HR user's calendar feed address; POST replaces it with a new one."""
+    feed, _ = CalendarFeed.objects.get_or_create(user=request.user)
+    if request.method == 'POST':
+        feed.token = uuid.uuid4()
+        feed.save(update_fields=['token'])
+        messages.success(request, "✅ New calendar address created. The previous one no longer works.")
+        return redirect('calendar-subscription')
+
+    feed_url = request.build_absolute_uri(reverse('interview-calendar-feed', kwargs={'token': feed.token}))
+    return render(request, 'jobs/calendar_subscription.html', {
+        'feed_url': feed_url,
+        'webcal_url': 'webcal://' + feed_url.split('://', 1)[1],
+    })
+
+# --- Candidate history ---
+
+@query_budget(9)  # candidate and its six prefetches
+@login_required
+@user_passes_test(is_hr_user)
+def candidate_timeline(request, pk):
+    """Everything a candidate has sent us and how it went, newest first."""
+    candidate = get_object_or_404(
+        Candidate.objects.prefetch_related(
+            Prefetch('cv_submissions', queryset=CVSubmission.objects.select_related('job', 'department')),
+            Prefetch('applications', queryset=DetailedApplication.objects.select_related('link__job')),
+            Prefetch('applications__stage_transitions', queryset=StageTransition.objects.select_related('changed_by')),
+            Prefetch('applications__interviews', queryset=Interview.objects.select_related('interviewer')),
+            Prefetch('archived_cv_submissions', queryset=ArchivedCVSubmission.objects.select_related('job')),
+            Prefetch('archived_applications', queryset=ArchivedApplication.objects.select_related('job')),
+        ),
+        pk=pk,
+    )
+
+    events = []
+    for cv in candidate.cv_submissions.all():
+        events.append({
+            'at': cv.submitted_at, 'icon': 'file-earmark-person',
+            'title': f"CV for {cv.job.title if cv.job else 'General Application'}",
+            'detail': cv.department.name if cv.department else '',
+            'url': cv.cv_file.url,
+        })
+    for application in candidate.applications.all():
+        job_title = application.link.job.title if application.link.job else "General Application"
+        events.append({
+            'at': application.submitted_at, 'icon': 'file-earmark-text',
+            'title': f"Application for {job_title}",
+            'detail': application.get_overall_status_display(),
+            # Only the HR user who sent the link can manage the application.
+            'url': (reverse('update-application-status', kwargs={'pk': application.pk})
+                    if application.link.created_by_id == request.user.pk else None),
+        })
+        for transition in application.stage_transitions.all():
+            if transition.from_status == StageTransition.ENTERED:
+                continue
+            events.append({
+                'at': transition.changed_at, 'icon': 'clipboard-check',
+                'title': f"{STAGE_NAMES[transition.stage]} {transition.get_to_status_display().lower()}",
+                'detail': f"{job_title}, by {transition.changed_by}" if transition.changed_by else job_title,
+            })
+        for interview in application.interviews.all():
+            events.append({
+                'at': interview.start, 'icon': 'calendar-event',
+                'title': f"{STAGE_NAMES[interview.stage]} with {interview.interviewer}",
+                'detail': job_title,
+            })
+    for cv in candidate.archived_cv_submissions.all():
+        events.append({
+            'at': cv.submitted_at, 'icon': 'archive',
+            'title': f"CV for {cv.job.title if cv.job else 'General Application'} (archived)",
+            'url': reverse('download-archived-cv', kwargs={'pk': cv.pk}),
+        })
+    for application in candidate.archived_applications.all():
+        events.append({
+            'at': application.submitted_at, 'icon': 'archive',
+            'title': f"Application for {application.job.title if application.job else 'General Application'} (archived)",
+            'detail': application.get_overall_status_display(),
+        })
+    events.sort(key=lambda event: event['at'], reverse=True)
+
+    return render(request, 'jobs/candidate_timeline.html', {
+        'candidate': candidate,
+        'events': events,
+        'now': timezone.now(),
+    })
+
+# --- Interview scheduling ---
+
+@query_budget(5)
+@login_required
+@user_passes_test(is_hr_user)
+def interviewer_availability(request):
+    """Lists the HR user's upcoming availability windows; POST adds or removes one."""
+    if request.method == 'POST' and request.POST.get('delete', '').isdigit():
+        InterviewerAvailability.objects.filter(pk=request.POST['delete'], interviewer=request.user).delete()
+        messages.success(request, "✅ Availability window removed. Interviews already booked in it are kept.")
+        return redirect('interviewer-availability')
+
+    form = InterviewerAvailabilityForm(request.POST or None, interviewer=request.user)
+    if request.method == 'POST':
+        if form.is_valid():
+            form.save()
+            messages.success(request, "✅ Availability window added.")
+            return redirect('interviewer-availability')
+        messages.error(request, "❌ Please correct the availability window.")
+
+    booked = (
+        Interview.objects.filter(
+            interviewer=OuterRef('interviewer'), start__lt=OuterRef('end'), end__gt=OuterRef('start'),
+        ).order_by().values('interviewer').annotate(count=Count('pk')).values('count')
+    )
+    windows = (
+        InterviewerAvailability.objects.filter(interviewer=request.user, end__gt=timezone.now())
+        .annotate(booked=Coalesce(Subquery(booked), 0))
+    )
+    return render(request, 'jobs/interviewer_availability.html', {'form': form, 'windows': windows})
+
+@query_budget(10)  # the form's job and interviewer lists, candidates, windows and bookings
+@login_required
+@user_passes_test(is_hr_user)
+def plan_interviews(request):
+    """
+    Proposes the next free slots for the candidates waiting at a stage (GET)
+    and books the proposals HR accepts (POST).
+    """
+    if request.method == 'POST':
+        return book_planned_interviews(request)
+
+    form = InterviewPlanForm(request.GET or None, user=request.user)
+    proposals, unplaced = [], []
+    if form.is_valid():
+        stage = form.cleaned_data['stage']
+        interviewers = {user.pk: user for user in form.cleaned_data['interviewers']}
+        candidates = (
+            DetailedApplication.objects
+            .filter(DetailedApplication.at_stage(stage), link__created_by=request.user)
+            .exclude(interviews__stage=stage)
+            .select_related('link__job')
+            .order_by('submitted_at')
+        )
+        if form.cleaned_data['job']:
+            candidates = candidates.filter(link__job=form.cleaned_data['job'])
+        planned, unplaced = scheduling.plan(
+            candidates[:form.cleaned_data['count']], list(interviewers),
+            form.cleaned_data['not_before'] or timezone.now(),
+        )
+        proposals = [
+            {'application': application, 'interviewer': interviewers[interviewer_id], 'start': start, 'end': end,
+             'value': f'{application.pk},{interviewer_id},{start.isoformat()}'}
+            for application, interviewer_id, start, end in planned
+        ]
+
+    return render(request, 'jobs/plan_interviews.html', {
+        'form': form,
+        'proposals': proposals,
+        'unplaced': unplaced,
+    })
+
+def book_planned_interviews(request):
+    stage = request.POST.get('stage', '')
+    if stage not in DetailedApplication.STAGES:
+        messages.error(request, "❌ Choose a stage.")
+        return redirect('plan-interviews')
+
+    # Each accepted proposal is "<application>,<interviewer>,<start>".
+    accepted = []
+    for value in request.POST.getlist('booking'):
+        try:
+            pk, interviewer_id, start = value.split(',', 2)
+            accepted.append((int(pk), int(interviewer_id), datetime.fromisoformat(start)))
+        except ValueError:
+            continue
+    applications = (
+        DetailedApplication.objects
+        .filter(DetailedApplication.at_stage(stage), link__created_by=request.user)
+        .in_bulk([pk for pk, _, _ in accepted])
+    )
+    length = scheduling.slot_length()
+    bookings = [
+        (applications[pk], interviewer_id, start, start + length)
+        for pk, interviewer_id, start in accepted if pk in applications
+    ]
+    if not bookings:
+        messages.warning(request, "⚠️ No interviews selected.")
+        return redirect('plan-interviews')
+
+    try:
+        scheduling.book(bookings, stage)
+    except scheduling.SchedulingConflict as e:
+        messages.error(request, f"❌ Nothing was booked, some slots were taken meanwhile: {e}. Plan again.")
+        return redirect('plan-interviews')
+    messages.success(request, f"✅ Booked {len(bookings)} {STAGE_NAMES[stage]}(s).")
+    return redirect('plan-interviews')
+
+@query_budget(2)
+@login_required
+@user_passes_test(is_hr_user)
+def db_pool_status(request):
+    """Exposes the database connection pool size and wait metrics as JSON."""
+    db_settings = settings.DATABASES['default']
+    return JsonResponse({
+        "pooling": bool(db_settings.get('OPTIONS', {}).get('pool')),
+        "conn_max_age": db_settings.get('CONN_MAX_AGE', 0),
+        "health_checks": db_settings.get('CONN_HEALTH_CHECKS', False),
+        "stats": get_pool_stats(),
+    })
+
+def has_metrics_token(request):
+    if not settings.METRICS_TOKEN:
+        return False
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    # Compare bytes: compare_digest() raises TypeError on non-ASCII str.
+    return scheme.lower() == 'bearer' and hmac.compare_digest(token.strip().encode(), settings.METRICS_TOKEN.encode())
+
+@query_budget(2)
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Open to staff users and to a scraper sending
+    ``Authorization: Bearer <METRICS_TOKEN>``.
+    """
+    if not (has_metrics_token(request) or is_hr_user(request.user)):
+        return HttpResponseForbidden()
+    body, content_type = metrics.render_latest()
+    return HttpResponse(body, content_type=content_type)
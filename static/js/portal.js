@@ -0,0 +1,35 @@
+// Scroll-in animations
+AOS.init({
+    duration: 800,   // Animation lasts 800ms
+    once: true,      // Animation happens only once
+    offset: 50       // Start animating when element is 50px from bottom
+});
+
+// Notification badge polling (HR pages only, see data-notifications-url on <body>)
+document.addEventListener('DOMContentLoaded', () => {
+    const notificationsUrl = document.body.dataset.notificationsUrl;
+    if (!notificationsUrl) return;
+
+    setInterval(() => {
+        fetch(notificationsUrl)
+        .then(res => res.text())
+        .then(html => {
+            const parser = new DOMParser();
+            const doc = parser.parseFromString(html, 'text/html');
+            const newBadge = doc.querySelector('#notif-badge');
+            const currentBadge = document.querySelector('#notif-badge');
+            if (currentBadge && newBadge) currentBadge.textContent = newBadge.textContent;
+        });
+    }, 10000); // check every 10 seconds
+});
+
+// Navbar Scroll Effect
+const navbar = document.querySelector('.navbar');
+
+window.addEventListener('scroll', () => {
+    if (window.scrollY > 50) {
+        navbar.classList.add('scrolled');
+    } else {
+        navbar.classList.remove('scrolled');
+    }
+});